@@ -1,10 +1,8 @@
 import json
+import traceback
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-import torch.multiprocessing as mp
-
-mp.set_start_method("spawn", force=True)
-
 from .base import init_tool_instance
 from .model_config import get_model_config_instance, load_model_for_agent
 
@@ -50,9 +48,8 @@ class MMStoryAgent:
         for sub_dir in self.modalities:
             (story_dir / sub_dir).mkdir(exist_ok=True, parents=True)
 
-        processes_to_run = []
-        manager = mp.Manager()
-        return_dict = manager.dict()
+        jobs_to_run = []
+        return_dict = {}
 
         image_dir = story_dir / "image"
         num_images = len(list(image_dir.glob("p*.png")))
@@ -70,7 +67,7 @@ class MMStoryAgent:
             agent = init_tool_instance({"tool": agent_config["tool"], "cfg": merged_cfg})
             params = agent_config["params"].copy()
             params.update({"pages": pages, "save_path": image_dir})
-            processes_to_run.append(mp.Process(target=self.call_modality_agent, args=("image", agent, params, return_dict)))
+            jobs_to_run.append(("image", agent, params))
 
         speech_dir = story_dir / "speech"
         num_speech_files = len(list(speech_dir.glob("s*.wav")))
@@ -84,13 +81,23 @@ class MMStoryAgent:
             agent = init_tool_instance({"tool": agent_config["tool"], "cfg": merged_cfg})
             params = agent_config["params"].copy()
             params.update({"pages": pages, "save_path": speech_dir, "segmented_pages": segmented_pages})
-            processes_to_run.append(mp.Process(target=self.call_modality_agent, args=("speech", agent, params, return_dict)))
-
-        if processes_to_run:
-            for p in processes_to_run:
-                p.start()
-            for p in processes_to_run:
-                p.join()
+            jobs_to_run.append(("speech", agent, params))
+
+        if jobs_to_run:
+            # 图像与语音互不依赖，耗时都在等待远端服务/GPU 上：用线程并行即可，
+            # 省去 Manager 服务进程和 spawn 子进程重新导入 torch 等依赖的开销，结果也无需跨进程传回
+            with ThreadPoolExecutor(max_workers=len(jobs_to_run), thread_name_prefix="modality") as executor:
+                futures = {
+                    modality: executor.submit(self.call_modality_agent, modality, agent, params, return_dict)
+                    for modality, agent, params in jobs_to_run
+                }
+            for modality, future in futures.items():
+                try:
+                    future.result()
+                except Exception:
+                    # 与之前子进程的行为一致：打印失败原因，不中断其余阶段
+                    print(f"   ✗ {modality} generation failed:")
+                    traceback.print_exc()
         else:
             print("   ✓ All modality assets already exist.")
 
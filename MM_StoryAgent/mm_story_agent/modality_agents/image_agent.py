@@ -1,9 +1,77 @@
+import base64
+import functools
+import hashlib
+import io
 import json
+import os
+import re
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import List, Dict
 
 from mm_story_agent.base import register_tool, init_tool_instance
 from mm_story_agent.prompts_en import role_extract_system, role_review_system, \
-    story_to_image_reviser_system, story_to_image_review_system
+    story_to_image_reviser_system, story_to_image_review_system, story_to_image_batch_reviser_system
+
+try:  # optional: faster request-body serialization
+    import orjson
+except ImportError:
+    orjson = None
+
+# 批量起草图像描述时每次 LLM 请求最多包含的页数
+_PROMPT_BATCH_PAGES = 8
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
+
+# 逐页 reviser/reviewer 请求体模板：all_pages 每个故事只序列化一次，按页拼出与
+# json.dumps({...}, ensure_ascii=False) 逐字节相同的 JSON
+_dumps = functools.partial(json.dumps, ensure_ascii=False)
+_PAGE_PAYLOAD_PREFIX = '{{"all_pages": {all_pages}, "current_page": {current_page}'
+_REVISER_PAYLOAD = '{prefix}, "previous_result": {previous_result}, "improvement_suggestions": {improvement_suggestions}}}'
+_REVIEW_PAYLOAD = '{prefix}, "image_description": {image_description}}}'
+_BATCH_PAYLOAD = '{{"all_pages": {all_pages}, "page_indices": {page_indices}}}'
+
+
+@functools.lru_cache(maxsize=1)
+def _http_session():
+    """Process-wide requests.Session: keep-alive + pooled TCP/TLS connections for all providers."""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    # 只对幂等请求（图片下载等 GET）做重试；生成接口的 POST 不自动重放
+    retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _json_body(payload: Dict) -> bytes:
+    # 调用方已设置 Content-Type: application/json；直接传 bytes，requests 不再内部 json.dumps
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+def _download_image(url: str, size=None):
+    """Stream ``url`` into memory in 64 KiB chunks and decode it; LANCZOS-resize to ``size`` if given."""
+    from PIL import Image
+
+    buf = io.BytesIO()
+    with _http_session().get(url, timeout=30, stream=True) as response:
+        response.raise_for_status()
+        # 不经过 response.content 的整块 bytes，分块直接写入解码缓冲
+        response.raw.decode_content = True
+        shutil.copyfileobj(response.raw, buf, 65536)
+    buf.seek(0)
+    image = Image.open(buf)
+    if size is not None and image.size != tuple(size):
+        image = image.resize(tuple(size), Image.Resampling.LANCZOS)
+    return image
 
 
 @register_tool("story_diffusion_t2i")
@@ -16,12 +84,18 @@ class StoryDiffusionAgent:
         self.api_key = cfg.get("api_key", "")
         self.api_url = cfg.get("api_url", "")
         self.model_name = cfg.get("model_name", "")
+        # 每个线程按 system prompt 复用 LLM 实例（实例带 history，不能跨线程共享）
+        self._llm_local = threading.local()
 
     def call(self, params: Dict):
         pages: List = params["pages"]
         save_path: str = params["save_path"]
-        role_dict = self.extract_role_from_story(pages)
-        image_prompts = self.generate_image_prompt_from_story(pages)
+        save_path.mkdir(parents=True, exist_ok=True)
+        # 角色抽取与逐页图像描述互不依赖：角色抽取放到后台线程，与描述生成重叠执行
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="role-extract") as executor:
+            role_future = executor.submit(self.extract_role_from_story, pages)
+            image_prompts = self.generate_image_prompt_from_story(pages)
+            role_dict = role_future.result()
         image_prompts_with_role_desc = []
         for image_prompt in image_prompts:
             for role, role_desc in role_dict.items():
@@ -35,7 +109,8 @@ class StoryDiffusionAgent:
             style_name=params.get("style_name", "Storybook"),
             width=self.cfg.get("width", 512),
             height=self.cfg.get("height", 512),
-            seed=params.get("seed", 2047)
+            seed=params.get("seed", 2047),
+            use_cached=not params.get("regenerate", False)
         )
 
         for idx, image in enumerate(images):
@@ -46,7 +121,8 @@ class StoryDiffusionAgent:
         }
 
     def generate_images_via_api(self, prompts: List[str], style_name: str = "Storybook",
-                                width: int = 512, height: int = 512, seed: int = 2047):
+                                width: int = 512, height: int = 512, seed: int = 2047,
+                                use_cached: bool = True):
         """
         Generate images using API calls instead of local diffusion models.
         This method can be adapted to work with different image generation APIs.
@@ -54,9 +130,6 @@ class StoryDiffusionAgent:
         try:
             import requests
             from PIL import Image
-            import io
-            import base64
-            import time
         except ImportError as e:
             print(f"Warning: Required packages not available for API image generation: {e}")
             return self._create_placeholder_images(len(prompts), width, height)
@@ -78,6 +151,37 @@ class StoryDiffusionAgent:
         # Apply style to prompts
         style_template = styles.get(style_name, styles["Storybook"])
         styled_prompts = [style_template.format(prompt=prompt) for prompt in prompts]
+        # 相同的描述只向图像 API 请求一次，重复页复用同一张图
+        unique_prompts = list(dict.fromkeys(styled_prompts))
+        if len(unique_prompts) < len(styled_prompts):
+            print(f"Image generation: {len(styled_prompts) - len(unique_prompts)}/{len(styled_prompts)} "
+                  f"duplicate prompts reuse an earlier image")
+
+        # 持久化缓存（cfg image_cache=True 时开启）：同一 (描述, 尺寸, seed, 服务) 重跑故事时直接读盘；
+        # 重新生成（use_cached=False）时不读缓存，新结果照常写回覆盖旧条目
+        cache_dir = self._image_cache_dir()
+        cache_paths = {}
+        images_by_prompt = {}
+        if cache_dir is not None:
+            for prompt in unique_prompts:
+                key = hashlib.blake2b(
+                    f"{prompt}|{width}x{height}|{seed}|{self.api_type}|{self.model_name}".encode("utf-8"),
+                    digest_size=16).hexdigest()
+                cache_paths[prompt] = path = cache_dir / f"{key}.png"
+                if not use_cached:
+                    continue
+                try:
+                    with Image.open(path) as cached:
+                        images_by_prompt[prompt] = cached.copy()
+                    # 命中时刷新 mtime，淘汰按最近使用顺序进行
+                    os.utime(path)
+                except (OSError, ValueError):
+                    pass
+            if images_by_prompt:
+                print(f"Image cache: {len(images_by_prompt)}/{len(unique_prompts)} hits")
+        pending = [prompt for prompt in unique_prompts if prompt not in images_by_prompt]
+        if not pending:
+            return [images_by_prompt[prompt] for prompt in styled_prompts]
 
         images = []
 
@@ -87,22 +191,80 @@ class StoryDiffusionAgent:
         api_url = self.api_url
 
         if api_type == "dashscope" or api_type == "aliyun":
-            images = self._generate_with_dashscope_api(styled_prompts, width, height, api_key)
+            images = self._generate_with_dashscope_api(pending, width, height, api_key)
         elif api_type == "openai":
-            images = self._generate_with_openai_api(styled_prompts, width, height, api_key)
+            images = self._generate_with_openai_api(pending, width, height, api_key)
         elif api_type == "stability":
-            images = self._generate_with_stability_api(styled_prompts, width, height, api_key, api_url)
+            images = self._generate_with_stability_api(pending, width, height, api_key, api_url)
         elif api_type == "replicate":
-            images = self._generate_with_replicate_api(styled_prompts, width, height, api_key)
+            images = self._generate_with_replicate_api(pending, width, height, api_key)
         elif api_type == "custom":
-            images = self._generate_with_custom_api(styled_prompts, width, height, api_url, api_key)
+            images = self._generate_with_custom_api(pending, width, height, api_url, api_key)
         else:
             # Fallback: create placeholder images
             print(f"Warning: Unknown API type '{api_type}', creating placeholder images")
-            images = self._create_placeholder_images(len(prompts), width, height)
-
+            images = self._create_placeholder_images(len(pending), width, height)
+
+        stored = False
+        for prompt, image in zip(pending, images):
+            images_by_prompt[prompt] = image
+            if prompt in cache_paths and not image.info.get("placeholder"):
+                self._store_cached_image(cache_paths[prompt], image)
+                stored = True
+        if stored:
+            self._evict_image_cache(cache_dir)
+        images = [images_by_prompt[prompt] for prompt in styled_prompts]
         return images
 
+    def _image_cache_dir(self):
+        """Directory of the persistent image cache, or None unless enabled (cfg image_cache=True)."""
+        if not self.cfg.get("image_cache", False):
+            return None
+        cache_dir = Path(self.cfg.get("image_cache_dir") or Path.home() / ".cache" / "mm_story_agent" / "images")
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+        except OSError:
+            return None
+        return cache_dir
+
+    def _evict_image_cache(self, cache_dir: Path):
+        """Trim the cache to cfg image_cache_max_mb (default 512), dropping least recently used entries first."""
+        limit = int(self.cfg.get("image_cache_max_mb", 512)) * 1024 * 1024
+        entries = []
+        total = 0
+        for path in cache_dir.glob("*.png"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        if total <= limit:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            if total <= limit:
+                break
+
+    @staticmethod
+    def _store_cached_image(path: Path, image):
+        # 先写临时文件再原子替换，并发的两次运行不会读到写了一半的 PNG
+        tmp = path.with_name(f"{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            image.save(tmp, format="PNG")
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"Warning: could not write image cache entry {path}: {e}")
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+
     def _generate_with_dashscope_api(self, prompts: List[str], width: int, height: int, api_key: str):
         """Generate images using Aliyun DashScope API (通义万相)"""
         import os
@@ -118,10 +280,6 @@ class StoryDiffusionAgent:
         try:
             import dashscope
             from dashscope import ImageSynthesis
-            from PIL import Image
-            import requests
-            import io
-            import time
 
             # Set API key
             dashscope.api_key = api_key
@@ -139,10 +297,6 @@ class StoryDiffusionAgent:
         """Generate images serially to comply with API rate limits"""
         import dashscope
         from dashscope import ImageSynthesis
-        from PIL import Image
-        import requests
-        import io
-        import time
 
         dashscope.api_key = api_key
         images = []
@@ -163,13 +317,8 @@ class StoryDiffusionAgent:
                     # Get image URL from response
                     image_url = rsp.output.results[0].url
 
-                    # Download image
-                    image_response = requests.get(image_url)
-                    image = Image.open(io.BytesIO(image_response.content))
-
-                    # Resize if needed
-                    if image.size != (width, height):
-                        image = image.resize((width, height), Image.Resampling.LANCZOS)
+                    # Download image (resized if needed)
+                    image = _download_image(image_url, (width, height))
 
                     images.append(image)
                     print(f"Successfully generated image {idx + 1}/{len(prompts)} with DashScope API")
@@ -192,8 +341,6 @@ class StoryDiffusionAgent:
     def _generate_with_openai_api(self, prompts: List[str], width: int, height: int, api_key: str):
         """Generate images using OpenAI DALL-E API"""
         import openai
-        from PIL import Image
-        import requests
 
         if not api_key:
             print("Warning: No OpenAI API key provided, creating placeholder images")
@@ -214,12 +361,7 @@ class StoryDiffusionAgent:
                 )
 
                 image_url = response.data[0].url
-                image_response = requests.get(image_url)
-                image = Image.open(io.BytesIO(image_response.content))
-
-                # Resize if needed
-                if image.size != (width, height):
-                    image = image.resize((width, height), Image.Resampling.LANCZOS)
+                image = _download_image(image_url, (width, height))
 
                 images.append(image)
                 time.sleep(1)  # Rate limiting
@@ -232,9 +374,7 @@ class StoryDiffusionAgent:
 
     def _generate_with_stability_api(self, prompts: List[str], width: int, height: int, api_key: str, api_url: str):
         """Generate images using Stability AI API"""
-        import requests
         from PIL import Image
-        import io
 
         if not api_key:
             print("Warning: No Stability AI API key provided, creating placeholder images")
@@ -249,18 +389,20 @@ class StoryDiffusionAgent:
             "Content-Type": "application/json",
         }
 
+        # 除 prompt 外的请求参数整批不变，只构建一次
+        request_template = {
+            "cfg_scale": 7,
+            "height": height,
+            "width": width,
+            "samples": 1,
+            "steps": 30,
+        }
+
         for prompt in prompts:
             try:
-                data = {
-                    "text_prompts": [{"text": prompt}],
-                    "cfg_scale": 7,
-                    "height": height,
-                    "width": width,
-                    "samples": 1,
-                    "steps": 30,
-                }
+                data = {"text_prompts": [{"text": prompt}], **request_template}
 
-                response = requests.post(api_url, headers=headers, json=data)
+                response = _http_session().post(api_url, headers=headers, data=_json_body(data))
 
                 if response.status_code == 200:
                     result = response.json()
@@ -313,8 +455,7 @@ class StoryDiffusionAgent:
 
                 if output and len(output) > 0:
                     image_url = output[0]
-                    image_response = requests.get(image_url)
-                    image = Image.open(io.BytesIO(image_response.content))
+                    image = _download_image(image_url)
                     images.append(image)
                 else:
                     images.append(self._create_placeholder_image(width, height))
@@ -329,58 +470,51 @@ class StoryDiffusionAgent:
 
     def _generate_with_custom_api(self, prompts: List[str], width: int, height: int, api_url: str, api_key: str):
         """Generate images using a custom API endpoint"""
-        import requests
-        from PIL import Image
-        import io
-
         if not api_url:
             print("Warning: No custom API URL provided, creating placeholder images")
             return self._create_placeholder_images(len(prompts), width, height)
 
-        images = []
         headers = {"Content-Type": "application/json"}
         if api_key:
             headers["Authorization"] = f"Bearer {api_key}"
 
-        for prompt in prompts:
-            try:
-                data = {
-                    "prompt": prompt,
-                    "width": width,
-                    "height": height,
-                }
-
-                response = requests.post(api_url, headers=headers, json=data, timeout=60)
-
-                if response.status_code == 200:
-                    # Assume the API returns image data directly or a URL
-                    content_type = response.headers.get('content-type', '')
-                    if 'image' in content_type:
-                        image = Image.open(io.BytesIO(response.content))
-                    else:
-                        # Assume JSON response with image URL or base64 data
-                        result = response.json()
-                        if 'url' in result:
-                            image_response = requests.get(result['url'])
-                            image = Image.open(io.BytesIO(image_response.content))
-                        elif 'image' in result:
-                            image_data = base64.b64decode(result['image'])
-                            image = Image.open(io.BytesIO(image_data))
-                        else:
-                            raise ValueError("Unknown response format")
-
-                    images.append(image)
-                else:
-                    print(f"Custom API error: {response.status_code}")
-                    images.append(self._create_placeholder_image(width, height))
-
-                time.sleep(0.5)  # Rate limiting
+        # 自建端点没有云服务的 QPS 限制：以 api_concurrency 个并发请求代替串行 + sleep 限速
+        concurrency = max(1, min(int(self.cfg.get("api_concurrency", 4)), len(prompts)))
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="custom-t2i") as executor:
+            return list(executor.map(
+                lambda prompt: self._custom_api_image(prompt, width, height, api_url, headers), prompts))
 
-            except Exception as e:
-                print(f"Error generating image with custom API: {e}")
-                images.append(self._create_placeholder_image(width, height))
+    def _custom_api_image(self, prompt: str, width: int, height: int, api_url: str, headers: Dict):
+        from PIL import Image
 
-        return images
+        try:
+            data = {
+                "prompt": prompt,
+                "width": width,
+                "height": height,
+            }
+
+            response = _http_session().post(api_url, headers=headers, data=_json_body(data), timeout=60)
+
+            if response.status_code != 200:
+                print(f"Custom API error: {response.status_code}")
+                return self._create_placeholder_image(width, height)
+
+            # Assume the API returns image data directly or a URL
+            content_type = response.headers.get('content-type', '')
+            if 'image' in content_type:
+                return Image.open(io.BytesIO(response.content))
+            # Assume JSON response with image URL or base64 data
+            result = response.json()
+            if 'url' in result:
+                return _download_image(result['url'])
+            elif 'image' in result:
+                return Image.open(io.BytesIO(base64.b64decode(result['image'])))
+            raise ValueError("Unknown response format")
+
+        except Exception as e:
+            print(f"Error generating image with custom API: {e}")
+            return self._create_placeholder_image(width, height)
 
     def _create_placeholder_images(self, count: int, width: int, height: int):
         """Create placeholder images when API is not available"""
@@ -409,6 +543,8 @@ class StoryDiffusionAgent:
         y = (height - text_height) // 2
 
         draw.text((x, y), text, fill=(100, 100, 100), font=font, align="center")
+        # 占位图不进入持久化图像缓存
+        image.info["placeholder"] = True
 
         return image
 
@@ -418,33 +554,8 @@ class StoryDiffusionAgent:
     ):
         num_turns = self.cfg.get("num_turns", 3)
         
-        # 获取LLM配置（支持新旧两种方式）
-        llm_tool = self.cfg.get("llm", "qwen")
-        llm_cfg = {
-            "system_prompt": role_extract_system,
-            "track_history": False
-        }
-        
-        # 如果配置中有llm_model_name，添加到cfg中
-        if "llm_model_name" in self.cfg:
-            llm_cfg["model_name"] = self.cfg["llm_model_name"]
-        
-        role_extractor = init_tool_instance({
-            "tool": llm_tool,
-            "cfg": llm_cfg
-        })
-        
-        reviewer_cfg = {
-            "system_prompt": role_review_system,
-            "track_history": False
-        }
-        if "llm_model_name" in self.cfg:
-            reviewer_cfg["model_name"] = self.cfg["llm_model_name"]
-        
-        role_reviewer = init_tool_instance({
-            "tool": llm_tool,
-            "cfg": reviewer_cfg
-        })
+        role_extractor = self._get_llm(role_extract_system)
+        role_reviewer = self._get_llm(role_review_system)
         roles = {}
         review = ""
         for turn in range(num_turns):
@@ -468,52 +579,94 @@ class StoryDiffusionAgent:
             pages: List,
             num_turns: int = 3
     ):
-        # 获取LLM配置（支持新旧两种方式）
-        llm_tool = self.cfg.get("llm", "qwen")
-        
-        reviewer_cfg = {
-            "system_prompt": story_to_image_review_system,
-            "track_history": False
-        }
-        if "llm_model_name" in self.cfg:
-            reviewer_cfg["model_name"] = self.cfg["llm_model_name"]
-        
-        image_prompt_reviewer = init_tool_instance({
-            "tool": llm_tool,
-            "cfg": reviewer_cfg
-        })
-        
-        reviser_cfg = {
-            "system_prompt": story_to_image_reviser_system,
-            "track_history": False
-        }
-        if "llm_model_name" in self.cfg:
-            reviser_cfg["model_name"] = self.cfg["llm_model_name"]
-        
-        image_prompt_reviser = init_tool_instance({
-            "tool": llm_tool,
-            "cfg": reviser_cfg
-        })
-        image_prompts = []
-
-        for page in pages:
-            review = ""
-            image_prompt = ""
-            for turn in range(num_turns):
-                image_prompt, success = image_prompt_reviser.call(json.dumps({
-                    "all_pages": pages,
-                    "current_page": page,
-                    "previous_result": image_prompt,
-                    "improvement_suggestions": review,
-                }, ensure_ascii=False))
-                if image_prompt.startswith("Image description:"):
-                    image_prompt = image_prompt[len("Image description:"):]
-                review, success = image_prompt_reviewer.call(json.dumps({
-                    "all_pages": pages,
-                    "current_page": page,
-                    "image_description": image_prompt
-                }, ensure_ascii=False))
-                if review == "Check passed.":
-                    break
-            image_prompts.append(image_prompt)
-        return image_prompts
+        # 内容完全相同的页（回顾页、重复的角色介绍等）只跑一次 reviser/reviewer，结果按页回填
+        first_index = {}
+        page_slots = [first_index.setdefault(json.dumps(page, ensure_ascii=False, sort_keys=True), idx)
+                      for idx, page in enumerate(pages)]
+        unique = sorted(set(page_slots))
+        if len(unique) < len(pages):
+            print(f"Image prompts: {len(pages) - len(unique)}/{len(pages)} duplicate pages reuse an earlier result")
+        pages_json = _dumps(pages)
+        # 每页的 reviser/reviewer 循环互不依赖，且耗时都在 LLM 网络往返上，按页并发执行
+        max_workers = max(1, min(int(self.cfg.get("max_workers", 8)), len(unique)))
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="image-prompt") as executor:
+            drafts = {}
+            if self.cfg.get("batch_prompts", True) and len(unique) > 1:
+                # 首轮描述一次请求起草多页（≤8 页一批），省去 N 次首轮 reviser 往返
+                chunks = [unique[i:i + _PROMPT_BATCH_PAGES] for i in range(0, len(unique), _PROMPT_BATCH_PAGES)]
+                for chunk, texts in zip(chunks, executor.map(
+                        lambda indices: self._draft_image_prompts_batch(pages_json, indices), chunks)):
+                    drafts.update(zip(chunk, texts))
+            # 按页索引回收结果，再展开回原页序
+            results = dict(zip(unique, executor.map(
+                lambda idx: self._image_prompt_for_page(pages_json, pages[idx], num_turns, drafts.get(idx, "")),
+                unique)))
+        return [results[slot] for slot in page_slots]
+
+    def _draft_image_prompts_batch(self, pages_json: str, indices) -> List[str]:
+        """First-round descriptions for the pages at ``indices`` in one LLM call; "" where unusable."""
+        reviser = self._get_llm(story_to_image_batch_reviser_system)
+        text, success = reviser.call(_BATCH_PAYLOAD.format_map({
+            "all_pages": pages_json,
+            "page_indices": _dumps(list(indices)),
+        }), max_length=max(1024, 256 * len(indices)))
+        descriptions = {}
+        if success and text:
+            text = text.strip().strip("```json").strip("```")
+            match = _JSON_OBJECT_RE.search(text)
+            try:
+                for item in json.loads(match.group(0) if match else text)["descriptions"]:
+                    descriptions[int(item["index"])] = str(item["text"]).strip()
+            except (ValueError, KeyError, TypeError):
+                # 解析失败：这些页回退到逐页 reviser
+                descriptions = {}
+        return [descriptions.get(idx, "") for idx in indices]
+
+    def _get_llm(self, system_prompt: str):
+        llms = getattr(self._llm_local, "llms", None)
+        if llms is None:
+            llms = self._llm_local.llms = {}
+        llm = llms.get(system_prompt)
+        if llm is None:
+            # 获取LLM配置（支持新旧两种方式）
+            llm_cfg = {
+                "system_prompt": system_prompt,
+                "track_history": False
+            }
+            if "llm_model_name" in self.cfg:
+                llm_cfg["model_name"] = self.cfg["llm_model_name"]
+            if self.cfg.get("llm_cache"):
+                llm_cfg["cache"] = True
+            llm = llms[system_prompt] = init_tool_instance({
+                "tool": self.cfg.get("llm", "qwen"),
+                "cfg": llm_cfg
+            })
+        return llm
+
+    def _image_prompt_for_page(self, pages_json: str, page, num_turns: int, draft: str = ""):
+        image_prompt_reviewer = self._get_llm(story_to_image_review_system)
+        image_prompt_reviser = self._get_llm(story_to_image_reviser_system)
+        prefix = _PAGE_PAYLOAD_PREFIX.format_map({"all_pages": pages_json, "current_page": _dumps(page)})
+        review = ""
+        image_prompt = ""
+        # 请求体字段顺序保持 [固定 system prompt][all_pages][当前页及本轮变量]：
+        # 同一故事内各页、各轮请求前缀逐字节一致，服务端前缀缓存（context cache）才能命中
+        for turn in range(num_turns):
+            if turn == 0 and draft:
+                # 批量起草的结果直接作为首轮描述进入评审
+                image_prompt = draft
+            else:
+                image_prompt, success = image_prompt_reviser.call(_REVISER_PAYLOAD.format_map({
+                    "prefix": prefix,
+                    "previous_result": _dumps(image_prompt),
+                    "improvement_suggestions": _dumps(review),
+                }))
+            if image_prompt.startswith("Image description:"):
+                image_prompt = image_prompt[len("Image description:"):]
+            review, success = image_prompt_reviewer.call(_REVIEW_PAYLOAD.format_map({
+                "prefix": prefix,
+                "image_description": _dumps(image_prompt),
+            }))
+            if review == "Check passed.":
+                break
+        return image_prompt
@@ -1,10 +1,30 @@
+import hashlib
+import json
 import os
-from typing import Dict, Callable
+import threading
+from collections import OrderedDict
+from typing import Dict, Callable, Iterator
 
 from dashscope import Generation
 
 from mm_story_agent.base import register_tool
 
+try:  # optional: persist cached responses across processes
+    import diskcache
+except ImportError:
+    diskcache = None
+
+# 进程内精确匹配缓存：相同 (模型, 消息, 采样参数) 直接复用上次成功的回复
+_RESPONSE_CACHE: "OrderedDict[str, str]" = OrderedDict()
+_RESPONSE_CACHE_SIZE = 512
+_RESPONSE_CACHE_LOCK = threading.Lock()
+
+
+def _response_cache_key(model_name, messages, top_p, temperature, seed, max_length) -> str:
+    payload = json.dumps([model_name, messages, top_p, temperature, seed, max_length],
+                         ensure_ascii=False, sort_keys=True)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
 
 @register_tool("qwen")
 class QwenAgent(object):
@@ -21,6 +41,10 @@ class QwenAgent(object):
                 {"role": "system", "content": self.system_prompt}
             ]
         self.track_history = track_history
+        # 默认关闭：重新生成（redo）同一请求时应得到新的采样结果，需要复用时由调用方显式开启
+        self.use_cache = config.get("cache", False)
+        cache_dir = config.get("cache_dir")
+        self.disk_cache = diskcache.Cache(cache_dir) if (self.use_cache and cache_dir and diskcache) else None
 
     def basic_success_check(self, response):
         if not response or not response.output or not response.output.text:
@@ -29,6 +53,25 @@ class QwenAgent(object):
         else:
             return True
 
+    def _cache_get(self, key):
+        with _RESPONSE_CACHE_LOCK:
+            text = _RESPONSE_CACHE.get(key)
+            if text is not None:
+                _RESPONSE_CACHE.move_to_end(key)
+                return text
+        if self.disk_cache is not None:
+            return self.disk_cache.get(key)
+        return None
+
+    def _cache_put(self, key, text):
+        with _RESPONSE_CACHE_LOCK:
+            _RESPONSE_CACHE[key] = text
+            _RESPONSE_CACHE.move_to_end(key)
+            while len(_RESPONSE_CACHE) > _RESPONSE_CACHE_SIZE:
+                _RESPONSE_CACHE.popitem(last=False)
+        if self.disk_cache is not None:
+            self.disk_cache.set(key, text)
+
     def call(self,
              prompt: str,
              model_name: str = "qwen2-72b-instruct",
@@ -45,7 +88,22 @@ class QwenAgent(object):
         })
         success = False
         try_times = 0
-        while try_times < max_try:
+        if success_check_fn is None:
+            success_check_fn = lambda x: True
+        response = None
+        cache_key = None
+        if self.use_cache:
+            # 固定 seed 下同一请求的结果可复用（重试、重复页面、多次运行同一故事）
+            cache_key = _response_cache_key(model_name, self.history, top_p, temperature, seed, max_length)
+            cached = self._cache_get(cache_key)
+            if cached is not None and success_check_fn(cached):
+                response = cached
+                self.history.append({
+                    "role": "assistant",
+                    "content": response
+                })
+                success = True
+        while not success and try_times < max_try:
             response = Generation.call(
                 model=model_name,
                 messages=self.history,
@@ -55,10 +113,10 @@ class QwenAgent(object):
                 seed=seed,
                 max_length=max_length
             )
-            if success_check_fn is None:
-                success_check_fn = lambda x: True
             if self.basic_success_check(response) and success_check_fn(response.output.text):
                 response = response.output.text
+                if cache_key is not None:
+                    self._cache_put(cache_key, response)
                 self.history.append({
                     "role": "assistant",
                     "content": response
@@ -75,3 +133,67 @@ class QwenAgent(object):
                 self.history = []
 
         return response, success
+
+    def stream(self,
+               prompt: str,
+               model_name: str = "qwen2-72b-instruct",
+               top_p: float = 0.95,
+               temperature: float = 1.0,
+               seed: int = 1,
+               max_length: int = 1024
+               ) -> Iterator[str]:
+        """Yield the reply as incremental text deltas (DashScope SSE) instead of waiting for the whole body.
+
+        History and the response cache are updated like ``call`` once the stream completes; an API
+        error ends the stream early and nothing is recorded.
+        """
+        self.history.append({
+            "role": "user",
+            "content": prompt
+        })
+        try:
+            cache_key = None
+            if self.use_cache:
+                cache_key = _response_cache_key(model_name, self.history, top_p, temperature, seed, max_length)
+                cached = self._cache_get(cache_key)
+                if cached is not None:
+                    self.history.append({
+                        "role": "assistant",
+                        "content": cached
+                    })
+                    yield cached
+                    return
+            pieces = []
+            responses = Generation.call(
+                model=model_name,
+                messages=self.history,
+                top_p=top_p,
+                temperature=temperature,
+                api_key=os.environ.get('DASHSCOPE_API_KEY'),
+                seed=seed,
+                max_length=max_length,
+                stream=True,
+                incremental_output=True
+            )
+            for response in responses:
+                if response.status_code != 200:
+                    print(response)
+                    return
+                text = response.output.text if response.output else None
+                if text:
+                    pieces.append(text)
+                    yield text
+            response = "".join(pieces)
+            if response:
+                if cache_key is not None:
+                    self._cache_put(cache_key, response)
+                self.history.append({
+                    "role": "assistant",
+                    "content": response
+                })
+        finally:
+            if not self.track_history:
+                if self.system_prompt is not None:
+                    self.history = self.history[:1]
+                else:
+                    self.history = []
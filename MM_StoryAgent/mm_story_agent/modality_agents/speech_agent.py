@@ -1,7 +1,9 @@
+import functools
 import json
 import os
 import re
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict
 
 # Suppress noisy warnings the user doesn't want to see
@@ -20,11 +22,26 @@ import nls
 import requests
 from aliyunsdkcore.client import AcsClient
 from aliyunsdkcore.request import CommonRequest
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from mm_story_agent.base import register_tool
 from mm_story_agent.video_compose_agent import split_text_for_speech
 
 
+@functools.lru_cache(maxsize=1)
+def _http_session():
+    """Process-wide requests.Session for HTTP synthesizers: keep-alive, pooled connections, retry on 429/5xx."""
+    # TTS 请求是幂等的（同一文本写同一文件），POST 也允许重试
+    retry = Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504),
+                  allowed_methods=frozenset({"GET", "POST"}))
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
 # Due to the trouble regarding environment, we use dashscope to deploy and call the API for CosyVoice.
 class CosyVoiceSynthesizer:
 
@@ -111,8 +128,8 @@ class CosyVoiceSynthesizer:
                 chunk_file = f"{save_file}.chunk_{i}.wav"
                 self._synthesize_chunk(chunk_file, chunk, voice, sample_rate)
 
-                # Load audio data
-                audio_data, sr = sf.read(chunk_file)
+                # Load audio data (float32: exact for the 16-bit NLS output, half the bytes of float64)
+                audio_data, sr = sf.read(chunk_file, dtype='float32')
                 audio_chunks.append(audio_data)
 
                 # Clean up chunk file
@@ -128,11 +145,9 @@ class CosyVoiceSynthesizer:
     def _synthesize_chunk(self, save_file, transcript, voice="xiaoyun", sample_rate=16000):
         """Synthesize a single text chunk"""
         writer = open(save_file, "wb")
-        return_data = b''
 
         def write_data(data, *args):
-            nonlocal return_data
-            return_data += data
+            # 直接落盘；不再把每个分片拼接进一个从未使用的 bytes（逐片拼接是 O(n^2) 拷贝）
             if writer is not None:
                 writer.write(data)
 
@@ -160,18 +175,24 @@ class NeuttAirSynthesizer:
 
     def __init__(self, cfg) -> None:
         self.api_url = cfg.get('api_url', 'http://127.0.0.1:8000/tts')
+        # (连接, 读取) 超时：死掉的端点快速失败，合成本身留足时间
+        self.timeout = (3.05, float(cfg.get('timeout', 60)))
 
     def call(self, save_file, transcript, voice="default", sample_rate=16000):
         try:
-            response = requests.post(self.api_url, json={
+            response = _http_session().post(self.api_url, json={
                 'text': transcript,
                 'voice': voice,
                 'sample_rate': sample_rate
-            })
-            response.raise_for_status()  # Raise an exception for bad status codes
+            }, timeout=self.timeout, stream=True)
+            with response:
+                response.raise_for_status()  # Raise an exception for bad status codes
 
-            with open(save_file, 'wb') as f:
-                f.write(response.content)
+                # 音频流按 64 KiB 分块直接写入文件，不先整体读成 response.content；
+                # iter_content 会把传输中断包装成 RequestException，错误处理不变
+                with open(save_file, 'wb') as f:
+                    for chunk in response.iter_content(65536):
+                        f.write(chunk)
 
         except requests.exceptions.RequestException as e:
             raise RuntimeError(f'NeuttAir API request failed: {e}')
@@ -308,6 +329,10 @@ class KokoroSynthesizer:
         sf.write(save_file, audio_out, sr)
 
 
+# 只有远端合成（NLS websocket / HTTP）可以安全地并发调用；本地模型（transformers、Kokoro）共享同一份权重，保持串行
+_CONCURRENT_SYNTHESIZERS = (CosyVoiceSynthesizer, NeuttAirSynthesizer)
+
+
 @register_tool("speech_generation")
 class SpeechAgent:
 
@@ -374,6 +399,7 @@ class SpeechAgent:
                     print(f"    段 {i + 1}: {segment} ({word_count} 单词)")
 
         # 根据切分结果生成语音 - 每个切分的句子生成一个独立的音频文件
+        jobs = []
         audio_file_counter = 1
 
         for page_idx, segments in enumerate(segmented_pages):
@@ -382,18 +408,31 @@ class SpeechAgent:
             for seg_idx, segment in enumerate(segments):
                 # 为每个切分的句子生成独立的音频文件
                 audio_filename = f"s{audio_file_counter}.wav"  # s1.wav, s2.wav, s3.wav, ...
-                audio_file_path = save_path / audio_filename
-
-                print(f"  生成音频 {audio_file_counter}: {segment[:50]}{'...' if len(segment) > 50 else ''}")
+                jobs.append((audio_file_counter, save_path / audio_filename, segment))
+                audio_file_counter += 1
 
-                generation_agent.call(
-                    save_file=audio_file_path,
-                    transcript=segment,
-                    voice=params.get("voice", "default"),
-                    sample_rate=self.cfg.get("sample_rate", 16000)
-                )
+        voice = params.get("voice", "default")
+        sample_rate = self.cfg.get("sample_rate", 16000)
+
+        def synthesize(job):
+            counter, audio_file_path, segment = job
+            print(f"  生成音频 {counter}: {segment[:50]}{'...' if len(segment) > 50 else ''}")
+            generation_agent.call(
+                save_file=audio_file_path,
+                transcript=segment,
+                voice=voice,
+                sample_rate=sample_rate
+            )
 
-                audio_file_counter += 1
+        workers = int(self.cfg.get("workers", 4)) if isinstance(generation_agent, _CONCURRENT_SYNTHESIZERS) else 1
+        workers = max(1, min(workers, len(jobs)))
+        if workers > 1:
+            # 每句独立写 s{n}.wav，远端合成按 workers 路并发；list() 让首个异常照常抛出
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="speech") as executor:
+                list(executor.map(synthesize, jobs))
+        else:
+            for job in jobs:
+                synthesize(job)
 
         print(f"语音生成完成，共生成 {audio_file_counter - 1} 个音频文件")
 
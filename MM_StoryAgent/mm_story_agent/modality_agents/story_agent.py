@@ -113,26 +113,23 @@ class QAOutlineStoryWriter:
                 print(f"Reached max_pages limit ({self.max_pages}), stopping generation.")
                 break
 
+            # 章节之间有数据依赖（completed_story 是前面各章已生成的页），只能按章串行；
+            # 请求体在本章的重试之间不变，只序列化一次
+            chapter_prompt = json.dumps(
+                {
+                    "completed_story": all_pages,
+                    "current_chapter": chapter
+                },
+                ensure_ascii=False
+            )
             chapter_detail, success = chapter_writer.call(
-                json.dumps(
-                    {
-                        "completed_story": all_pages,
-                        "current_chapter": chapter
-                    },
-                    ensure_ascii=False
-                ),
+                chapter_prompt,
                 success_check_fn=parse_list,
                 temperature=self.temperature
             )
             while success is False:
                 chapter_detail, success = chapter_writer.call(
-                    json.dumps(
-                        {
-                            "completed_story": all_pages,
-                            "current_chapter": chapter
-                        },
-                        ensure_ascii=False
-                    ),
+                    chapter_prompt,
                     seed=random.randint(0, 100000),
                     temperature=self.temperature,
                     success_check_fn=parse_list
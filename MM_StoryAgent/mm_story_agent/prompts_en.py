@@ -164,6 +164,29 @@ Output a string describing the image corresponding to the current story content
 4. Retain role names.
 """.strip()
 
+story_to_image_batch_reviser_system = """
+Convert each of the selected story pages into an image description.
+
+## Input Format
+The input consists of all story pages and the indices of the pages to describe, formatted as:
+{
+    "all_pages": ["xxx", "xxx"], // Each element is a page of story content
+    "page_indices": [0, 1] // 0-based indices into all_pages
+}
+
+## Output Format
+Output a JSON object without any additional content, with one entry per requested index:
+{
+    "descriptions": [{"index": 0, "text": "xxx"}, {"index": 1, "text": "xxx"}]
+}
+
+## Notes
+1. Keep it concise. Focus on the main visual elements, omit details.
+2. Retain visual elements. Only describe static scenes, avoid the plot details.
+3. Remove non-visual elements. Typical non-visual elements include dialogue, thoughts, and plot.
+4. Retain role names.
+""".strip()
+
 story_to_image_review_system = """
 Review the image description corresponding to the given story content. If the requirements are met, output "Check passed.". If not, provide improvement suggestions.
 
@@ -1,21 +1,28 @@
+import functools
+import json
+import logging
+import os
 import platform
 import random
 import re
 import signal
+import subprocess
+import tempfile
 import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import warnings
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
-from datetime import timedelta
+from itertools import repeat
 from pathlib import Path
 from typing import List, Union
 
-import cv2
 import librosa
 # transitions module removed in MoviePy v2; use slide_in/slide_out instead
 import numpy as np
 from moviepy.audio.AudioClip import AudioArrayClip
-from moviepy.audio.AudioClip import concatenate_audioclips
+from PIL import Image, ImageColor, ImageDraw, ImageFont
 
 try:
     from moviepy import vfx
@@ -39,29 +46,38 @@ from tqdm import trange, tqdm
 
 from mm_story_agent.base import register_tool
 
+try:  # optional: reads durations from the file header without decoding audio
+    import soundfile as sf
+except ImportError:
+    sf = None
 
-@contextmanager
-def timeout_context(seconds):
-    """跨平台超时上下文管理器"""
-    if platform.system() == 'Windows':
-        # Windows 使用线程超时
-        import threading
-        timeout_occurred = threading.Event()
+logger = logging.getLogger(__name__)
 
-        def timeout_handler():
-            timeout_occurred.set()
 
-        timer = threading.Timer(seconds, timeout_handler)
-        timer.start()
+class Deadline:
+    """轻量截止时间：调用方可在循环中轮询 expired()，无需额外线程"""
 
-        try:
-            yield timeout_occurred
-        finally:
-            timer.cancel()
-            if timeout_occurred.is_set():
-                raise TimeoutError(f"Operation timed out after {seconds} seconds")
+    def __init__(self, seconds):
+        self.deadline = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - time.monotonic())
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.deadline
+
+
+@contextmanager
+def timeout_context(seconds):
+    """跨平台超时上下文管理器，yield 一个 Deadline 供调用方轮询"""
+    deadline = Deadline(seconds)
+    if platform.system() == 'Windows' or threading.current_thread() is not threading.main_thread():
+        # Windows / 非主线程无法使用 SIGALRM：不再启动 Timer 线程，退出时检查截止时间
+        yield deadline
+        if deadline.expired():
+            raise TimeoutError(f"Operation timed out after {seconds} seconds")
     else:
-        # Unix/Linux 使用信号
+        # Unix/Linux 主线程使用信号，可中断阻塞操作
         def timeout_handler(signum, frame):
             raise TimeoutError(f"Operation timed out after {seconds} seconds")
 
@@ -69,7 +85,7 @@ def timeout_context(seconds):
         signal.alarm(seconds)
 
         try:
-            yield
+            yield deadline
         finally:
             signal.alarm(0)
             signal.signal(signal.SIGALRM, old_handler)
@@ -125,147 +141,342 @@ class ProgressTracker:
         self.close()
 
 
-def _write_video_with_ffmpeg(composite_clip, output_path, fps):
-    """使用 FFmpeg 直接写入视频，避免 moviepy 卡住的问题"""
-    import subprocess
-    import tempfile
-    import os
+# 硬件 H.264 编码器候选（按优先级）：编码器名 -> 专属参数（含像素格式）
+_HW_ENCODERS = (
+    ('h264_nvenc', ('-pix_fmt', 'yuv420p')),
+    ('h264_videotoolbox', ('-pix_fmt', 'yuv420p', '-b:v', '5M')),
+    ('h264_qsv', ('-pix_fmt', 'nv12')),
+)
+
+# libx264 的 preset 名映射到 NVENC 的 p1（最快）~ p7（最慢），调用方的速度/质量取舍对硬件编码同样生效
+_NVENC_PRESETS = {
+    'ultrafast': 'p1', 'superfast': 'p1', 'veryfast': 'p2', 'faster': 'p3', 'fast': 'p4',
+    'medium': 'p4', 'slow': 'p5', 'slower': 'p6', 'veryslow': 'p7',
+}
+
 
-    # 创建临时图像序列
-    temp_dir = tempfile.mkdtemp()
+def _hw_quality_args(name: str, preset: str, crf: int, x264_params=None) -> List[str]:
+    """Translate the libx264 settings (preset, CRF, keyint/bframes from x264_params) for a hardware encoder.
+
+    NVENC uses constant-quality VBR (-cq), QSV ICQ (-global_quality); VideoToolbox keeps its fixed bitrate.
+    tune has no hardware equivalent and is dropped.
+    """
+    args = []
+    if name == 'h264_nvenc':
+        args += ['-preset', _NVENC_PRESETS.get(preset, 'p4'), '-rc', 'vbr', '-cq', str(crf), '-b:v', '0']
+    elif name == 'h264_qsv':
+        # QSV accepts the x264 preset names as-is
+        args += ['-preset', preset, '-global_quality', str(crf)]
+    for item in (x264_params or '').split(':'):
+        key, _, value = item.partition('=')
+        if key == 'keyint' and value:
+            args += ['-g', value]
+        elif key == 'bframes' and value:
+            args += ['-bf', value]
+    return args
+
+
+@functools.lru_cache(maxsize=1)
+def _hw_encoder():
+    """探测一次可用的硬件编码器，返回 (name, args)；没有则返回 None（使用 libx264）
+
+    `ffmpeg -encoders` 只说明编译进了该编码器，不代表有对应的 GPU/驱动，
+    因此对列出的候选再做一次 1 帧的试编码。默认不启用（画质/码率依赖驱动默认值，与 libx264 输出不一致），
+    设置 VIDEO_HW_ENCODER=auto 自动选择，设置为具体编码器名则只尝试该编码器。
+    """
+
+    choice = os.environ.get('VIDEO_HW_ENCODER', 'off').strip().lower()
+    if choice in ('', '0', 'off', 'none', 'libx264'):
+        return None
+    candidates = [c for c in _HW_ENCODERS if choice == 'auto' or c[0] == choice]
     try:
-        # 将视频帧保存为图像序列
-        frame_count = int(composite_clip.duration * fps)
-        print(f"Writing {frame_count} frames to temporary directory...")
+        listing = subprocess.run(['ffmpeg', '-hide_banner', '-encoders'],
+                                 capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    for name, args in candidates:
+        if name not in listing:
+            continue
+        probe = ['ffmpeg', '-hide_banner', '-loglevel', 'error',
+                 '-f', 'lavfi', '-i', 'color=c=black:s=256x256:r=1', '-frames:v', '1',
+                 '-c:v', name, *args, '-f', 'null', '-']
+        try:
+            if subprocess.run(probe, capture_output=True, timeout=15).returncode == 0:
+                logger.info("使用硬件视频编码器: %s", name)
+                return name, args
+        except (OSError, subprocess.TimeoutExpired):
+            continue
+    return None
 
-        for i in range(frame_count):
-            t = i / fps
-            frame = composite_clip.get_frame(t)
-            frame_path = os.path.join(temp_dir, f"frame_{i:06d}.png")
-            cv2.imwrite(frame_path, cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
-
-        # 使用 FFmpeg 将图像序列转换为视频
-        cmd = [
-            'ffmpeg', '-y',
-            '-framerate', str(fps),
-            '-i', os.path.join(temp_dir, 'frame_%06d.png'),
-            '-c:v', 'libx264',
-            '-pix_fmt', 'yuv420p',
-            '-preset', 'fast',
-            output_path
-        ]
-
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            raise Exception(f"FFmpeg failed: {result.stderr}")
 
-    finally:
-        # 清理临时文件
-        import shutil
-        shutil.rmtree(temp_dir, ignore_errors=True)
+def _open_ffmpeg_rawvideo(output_path, size, fps, preset='veryfast', tune=None, audio_path=None,
+                         audio_codec='aac', audio_bitrate='128k', x264_params=None, crf=23):
+    """启动从 stdin 读取原始 RGB 帧的 FFmpeg 编码进程（不落盘 PNG）
 
+    传入 audio_path 时把该音频作为第二路输入，编码的同时直接封装成带音轨的最终文件，
+    无需先写无声视频再单独合并。
+    默认使用 libx264；通过 VIDEO_HW_ENCODER 显式启用硬件编码器（NVENC / VideoToolbox / QSV）时，
+    preset、crf 以及 x264_params 中的 keyint/bframes 会映射为对应参数，见 _hw_quality_args()。
+    preset 默认 veryfast：相比 fast 编码耗时明显下降，画质差异几乎不可见；
+    纯静态幻灯片可传 tune='stillimage'（仅 libx264），x264_params 透传 -x264-params。
+    """
 
-def _write_video_with_ffmpeg_detailed(composite_clip, output_path, fps, total_frames):
-    """使用 FFmpeg 直接写入视频，带详细进度显示"""
-    import subprocess
-    import tempfile
-    import os
-    import threading
-    import time
+    width, height = size
+    cmd = [
+        'ffmpeg', '-y',
+        '-loglevel', 'error',
+        '-f', 'rawvideo',
+        '-pix_fmt', 'rgb24',
+        '-s', f'{width}x{height}',
+        '-r', str(fps),
+        '-i', '-',
+    ]
+    if audio_path is not None:
+        cmd += ['-i', str(audio_path), '-map', '0:v:0', '-map', '1:a:0',
+                '-c:a', audio_codec, '-b:a', audio_bitrate, '-shortest']
+    hw = _hw_encoder()
+    if hw is not None:
+        name, args = hw
+        cmd += ['-c:v', name, *args, *_hw_quality_args(name, preset, crf, x264_params)]
+    else:
+        cmd += ['-c:v', 'libx264', '-pix_fmt', 'yuv420p', '-preset', preset, '-crf', str(crf), '-threads', '0']
+        if tune:
+            cmd += ['-tune', tune]
+        if x264_params:
+            cmd += ['-x264-params', x264_params]
+    cmd += ['-movflags', '+faststart']
+    cmd.append(str(output_path))
+    # stderr 写入临时文件而不是管道：写帧期间没有人读 stderr，日志一多管道写满会让 FFmpeg 和写帧方互相卡死
+    stderr_log = tempfile.TemporaryFile()
+    try:
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=stderr_log)
+    except BaseException:
+        stderr_log.close()
+        raise
+    proc.stderr_log = stderr_log
+    return proc
 
-    # 创建临时图像序列
-    temp_dir = tempfile.mkdtemp()
+
+def _abort_ffmpeg(proc):
+    """终止编码进程并释放 stderr 日志文件"""
+    proc.kill()
+    proc.wait()
+    proc.stderr_log.close()
+
+
+def _pipe_frame(proc, frame) -> bool:
+    """写入一帧到 FFmpeg stdin；FFmpeg 提前退出时返回 False"""
+    if frame.dtype != np.uint8:
+        frame = np.clip(frame, 0, 255).astype(np.uint8)
     try:
-        # 将视频帧保存为图像序列
-        frame_count = int(composite_clip.duration * fps)
-        print(f"写入 {frame_count} 帧到临时目录...")
-
-        # 帧写入进度监控
-        def frame_write_progress():
-            """帧写入进度监控"""
-            start_time = time.time()
-            for i in range(frame_count):
-                t = i / fps
-                frame = composite_clip.get_frame(t)
-                frame_path = os.path.join(temp_dir, f"frame_{i:06d}.png")
-                cv2.imwrite(frame_path, cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
-
-                # 显示进度
-                percent = ((i + 1) / frame_count) * 100
-                elapsed = time.time() - start_time
-                print(f"\r写入帧进度: {i + 1}/{frame_count} 帧 ({percent:.1f}%) - {elapsed:.1f}s", end='', flush=True)
-
-        frame_write_progress()
-        print(f"\n✓ 帧写入完成")
+        proc.stdin.write(np.ascontiguousarray(frame).tobytes())
+    except (BrokenPipeError, OSError):
+        return False
+    return True
 
-        # 使用 FFmpeg 将图像序列转换为视频，带进度显示
-        print("使用FFmpeg转换帧为视频...")
 
-        # FFmpeg转换进度监控 - 使用更准确的方法
-        def ffmpeg_progress_monitor():
-            """FFmpeg转换进度监控 - 基于实际文件大小"""
-            start_time = time.time()
-            last_size = 0
-            while not hasattr(ffmpeg_progress_monitor, 'stop'):
-                elapsed = time.time() - start_time
+def _finish_ffmpeg(proc, timeout=None, message="FFmpeg failed", on_wait=None):
+    """关闭 stdin 并等待编码结束，失败时抛出异常
 
-                # 检查输出文件是否存在及其大小
-                if os.path.exists(output_path):
-                    print(f"\rFFmpeg转换进度: 处理中... - {elapsed:.1f}s", end='', flush=True)
-                else:
-                    print(f"\rFFmpeg转换进度: 启动中... - {elapsed:.1f}s", end='', flush=True)
+    on_wait(elapsed) 在等待期间约每 0.5 秒于当前线程调用一次（用于显示收尾进度），无需额外监控线程。
+    """
 
-                time.sleep(0.5)
+    try:
+        proc.stdin.close()
+    except (BrokenPipeError, OSError):
+        pass
+    start = time.monotonic()
+    while True:
+        elapsed = time.monotonic() - start
+        # stderr 落在临时文件里，分片 wait 期间 FFmpeg 不会因日志输出而阻塞
+        step = None if on_wait is None else 0.5
+        if timeout is not None:
+            remaining = max(0.0, timeout - elapsed)
+            step = remaining if step is None else min(step, remaining)
+        try:
+            proc.wait(timeout=step)
+            break
+        except subprocess.TimeoutExpired:
+            elapsed = time.monotonic() - start
+            if timeout is not None and elapsed >= timeout:
+                _abort_ffmpeg(proc)
+                raise
+            if on_wait is not None:
+                on_wait(elapsed)
+    with proc.stderr_log as stderr_log:
+        if proc.returncode != 0:
+            stderr_log.seek(0)
+            raise Exception(f"{message}: {stderr_log.read().decode('utf-8', errors='replace')}")
+
+
+def _iter_frames(composite_clip, fps, frame_count, workers=None):
+    """按顺序产出帧；get_frame 在线程池中并行渲染，最多预取 2×workers 帧以限制内存"""
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        for i in range(frame_count):
+            yield composite_clip.get_frame(i / fps)
+        return
 
-        cmd = [
-            'ffmpeg', '-y',
-            '-framerate', str(fps),
-            '-i', os.path.join(temp_dir, 'frame_%06d.png'),
-            '-c:v', 'libx264',
-            '-pix_fmt', 'yuv420p',
-            '-preset', 'fast',
-            output_path
-        ]
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="frame")
+    pending = deque()
+    next_index = 0
+    try:
+        while next_index < frame_count and len(pending) < workers * 2:
+            pending.append(pool.submit(composite_clip.get_frame, next_index / fps))
+            next_index += 1
+        while pending:
+            frame = pending.popleft().result()
+            if next_index < frame_count:
+                pending.append(pool.submit(composite_clip.get_frame, next_index / fps))
+                next_index += 1
+            yield frame
+    finally:
+        # 提前结束（FFmpeg 退出或异常）时丢弃尚未开始的渲染
+        pool.shutdown(wait=True, cancel_futures=True)
 
-        # 启动进度监控
-        progress_thread = threading.Thread(target=ffmpeg_progress_monitor)
-        progress_thread.daemon = True
-        progress_thread.start()
 
-        # 运行 FFmpeg
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+def _write_video_with_ffmpeg_detailed(composite_clip, output_path, fps, total_frames, preset='veryfast', tune=None,
+                                      workers=None, audio_path=None, audio_codec='aac', x264_params=None):
+    """使用 FFmpeg 直接写入视频，带详细进度显示；给出 audio_path 时同时封装音轨"""
 
-        # 停止进度监控
-        ffmpeg_progress_monitor.stop = True
-        progress_thread.join(timeout=1)
+    frame_count = int(composite_clip.duration * fps)
+    print(f"通过管道写入 {frame_count} 帧到 FFmpeg...")
 
-        if result.returncode != 0:
-            raise Exception(f"FFmpeg失败: {result.stderr}")
+    # 帧在内存中直接送入编码器，编码与渲染并行进行
+    proc = _open_ffmpeg_rawvideo(output_path, composite_clip.size, fps, preset=preset, tune=tune,
+                                 audio_path=audio_path, audio_codec=audio_codec, x264_params=x264_params)
+    try:
+        start_time = time.time()
+        for i, frame in enumerate(_iter_frames(composite_clip, fps, frame_count, workers)):
+            if not _pipe_frame(proc, frame):
+                print("\nFFmpeg 提前退出，停止写入帧")
+                break
 
-        print(f"\n✓ FFmpeg转换完成")
+            # 显示进度
+            percent = ((i + 1) / frame_count) * 100
+            elapsed = time.time() - start_time
+            print(f"\r写入帧进度: {i + 1}/{frame_count} 帧 ({percent:.1f}%) - {elapsed:.1f}s", end='', flush=True)
+        print(f"\n✓ 帧写入完成")
+    except BaseException:
+        _abort_ffmpeg(proc)
+        raise
 
-    finally:
-        # 清理临时文件
-        import shutil
-        shutil.rmtree(temp_dir, ignore_errors=True)
+    print("等待FFmpeg完成编码...")
+    _finish_ffmpeg(proc, timeout=300, message="FFmpeg失败",
+                   on_wait=lambda elapsed: print(f"\rFFmpeg转换进度: 处理中... - {elapsed:.1f}s", end='', flush=True))
 
+    print(f"\n✓ FFmpeg转换完成")
 
-def _load_wav_as_stereo_clip(file_path: str, target_sr: int) -> AudioArrayClip:
-    """
-    Load an audio file using librosa and return a stereo AudioArrayClip at target_sr.
-    Ensures shape (num_samples, 2).
+
+@functools.lru_cache(maxsize=64)
+def _stereo_samples_cached(file_path: str, mtime_ns: int, size: int, target_sr: int) -> np.ndarray:
+    """Decode/resample an audio file to a read-only (num_samples, 2) float32 array.
+
+    Keyed on (path, mtime, size, sr) so re-runs of compose_video skip the decode while edits to the file
+    invalidate the entry; bounded because each entry holds the full decoded buffer.
     """
+    if sf is not None:
+        try:
+            # libsndfile: one in-process C read, already (n, channels) float32
+            data, sr = sf.read(file_path, dtype='float32', always_2d=True)
+        except Exception:
+            data = None
+        if data is not None:
+            if sr != target_sr:
+                data = np.ascontiguousarray(
+                    librosa.resample(data, orig_sr=sr, target_sr=target_sr, axis=0), dtype=np.float32)
+            if data.shape[1] == 1:
+                # mono -> duplicate to stereo
+                data = np.repeat(data, 2, axis=1)
+            data.setflags(write=False)
+            return data
+
     # mono=False to keep channels if present
     samples, sr = librosa.load(file_path, sr=target_sr, mono=False)
     # librosa returns (n,) or (channels, n)
-    if samples.ndim == 1:
-        # mono -> duplicate to stereo
-        samples = np.stack([samples, samples], axis=0)
-    elif samples.shape[0] == 1:
-        samples = np.repeat(samples, 2, axis=0)
-    # transpose to (n, 2)
-    samples = samples.T.astype(np.float32)
-    return AudioArrayClip(samples, fps=target_sr)
+    if samples.ndim == 1 or samples.shape[0] == 1:
+        # mono -> duplicate to stereo, writing straight into the (n, 2) output
+        mono = samples.reshape(-1).astype(np.float32, copy=False)
+        out = np.empty((mono.shape[0], 2), dtype=np.float32)
+        out[:, 0] = mono
+        out[:, 1] = mono
+    else:
+        # transpose to (n, channels) with a single cast+copy
+        out = np.ascontiguousarray(samples.T, dtype=np.float32)
+    out.setflags(write=False)
+    return out
+
+
+def _load_stereo_samples(file_path: str, target_sr: int) -> np.ndarray:
+    """Cached read-only (num_samples, 2) float32 samples of an audio file at target_sr."""
+    st = os.stat(file_path)
+    return _stereo_samples_cached(str(file_path), st.st_mtime_ns, st.st_size, target_sr)
+
+
+def _concat_audio_arrays(arrays, sample_rate: int) -> AudioArrayClip:
+    """Join (n, 2) sample arrays with one np.concatenate and wrap them in a single AudioArrayClip.
+
+    Cheaper to render than concatenate_audioclips, which dispatches every audio block to each sub-clip.
+    """
+    return AudioArrayClip(np.concatenate(arrays, axis=0), fps=sample_rate)
+
+
+@functools.lru_cache(maxsize=1024)
+def _audio_duration_cached(path: str, mtime_ns: int, size: int) -> float:
+    if sf is not None:
+        try:
+            # 只读取文件头，无需解码音频数据
+            info = sf.info(path)
+            return info.frames / info.samplerate
+        except Exception:
+            pass
+    return librosa.get_duration(path=path)
+
+
+def _audio_duration(path: Union[str, Path]) -> float:
+    """音频时长（秒），按 (路径, mtime, 大小) 缓存，文件改动后自动失效"""
+    st = os.stat(path)
+    return _audio_duration_cached(str(path), st.st_mtime_ns, st.st_size)
+
+
+_S_RE = re.compile(r's(\d+)\.wav$')
+
+
+def _numbered_wavs(directory: Path, pattern: re.Pattern = _S_RE) -> List[Path]:
+    """按文件名中的序号（pattern 的第一个分组）排序列出语音文件，一次 scandir、每个文件只解析一次"""
+    entries = []
+    try:
+        with os.scandir(directory) as it:
+            for e in it:
+                m = pattern.match(e.name)
+                if m:
+                    entries.append((int(m.group(1)), e.path))
+    except FileNotFoundError:
+        return []
+    entries.sort()
+    return [Path(p) for _, p in entries]
+
+
+_PAGE_WAV_RE = re.compile(r'(?:p(\d+)|s(\d+)_(\d+))\.wav$')
+
+
+def _page_speech_files(directory: Path):
+    """One scandir of the speech dir -> ({page: p{page}.wav}, {page: [s{page}_{n}.wav sorted by n]})."""
+    single = {}
+    multi = {}
+    try:
+        with os.scandir(directory) as it:
+            for e in it:
+                m = _PAGE_WAV_RE.match(e.name)
+                if m is None:
+                    continue
+                if m.group(1) is not None:
+                    single[int(m.group(1))] = e.path
+                else:
+                    multi.setdefault(int(m.group(2)), []).append((int(m.group(3)), e.path))
+    except FileNotFoundError:
+        pass
+    return single, {page: [Path(p) for _, p in sorted(files)] for page, files in multi.items()}
 
 
 def test_smart_splitting():
@@ -298,8 +509,7 @@ def verify_audio_subtitle_sync(story_dir: Path, timestamps: List):
         speech_file = speech_dir / f"p{i}.wav"
         if speech_file.exists():
             try:
-                import librosa
-                duration = librosa.get_duration(filename=str(speech_file))
+                duration = _audio_duration(speech_file)
                 print(f"  语音文件时长: {duration:.2f}s")
                 print(f"  时间轴时长: {end_time - start_time:.2f}s")
 
@@ -328,13 +538,12 @@ def correct_timestamps_with_audio(story_dir: Path, timestamps: List, fade_durati
         print(f"使用已计算的时间轴，共 {len(timestamps)} 个时间轴")
 
         # 验证时间轴是否与语音文件匹配
-        audio_files = sorted(speech_dir.glob("s*.wav"), key=lambda x: int(x.stem[1:]))
+        audio_files = _numbered_wavs(speech_dir)
         if len(timestamps) == len(audio_files):
             print("✓ 时间轴数量与语音文件数量匹配，直接使用")
             for i, (timestamp, audio_file) in enumerate(zip(timestamps, audio_files)):
                 try:
-                    import librosa
-                    actual_duration = librosa.get_duration(filename=str(audio_file))
+                    actual_duration = _audio_duration(audio_file)
                     print(f"语音文件 {audio_file.name}:")
                     print(f"  实际语音时长: {actual_duration:.2f}s")
                     print(f"  使用时间轴: {timestamp[0]:.2f}s - {timestamp[1]:.2f}s")
@@ -346,76 +555,79 @@ def correct_timestamps_with_audio(story_dir: Path, timestamps: List, fade_durati
             print(f"⚠️ 时间轴数量({len(timestamps)})与语音文件数量({len(audio_files)})不匹配，重新计算")
 
     # 如果没有时间轴或数量不匹配，重新计算
-    corrected_timestamps = []
-    current_time = 0
-
     # 查找所有语音文件，按s{i}.wav格式
-    audio_files = sorted(speech_dir.glob("s*.wav"), key=lambda x: int(x.stem[1:]))
+    audio_files = _numbered_wavs(speech_dir)
     print(f"找到 {len(audio_files)} 个语音文件")
 
+    # 先一次性读取所有时长（仅文件头），再用 cumsum 计算时间轴
+    n = len(audio_files)
+    offsets = np.full(n, slide_duration + fade_duration, dtype=np.float64)  # 语音前的转场：slide + fade
+    if n:
+        offsets[0] = slide_duration  # 第一个语音只有 slide
+    durations = np.zeros(n, dtype=np.float64)
+    keep_original = np.zeros(n, dtype=bool)
+    failed = np.zeros(n, dtype=bool)
     for i, audio_file in enumerate(audio_files):
         try:
-            import librosa
-            actual_duration = librosa.get_duration(filename=str(audio_file))
-
-            # 计算修正后的时间轴
-            if i == 0:
-                # 第一个语音：slide_duration + 实际语音时长
-                corrected_start = current_time + slide_duration
-                corrected_end = corrected_start + actual_duration
-                current_time += slide_duration + actual_duration
-            else:
-                # 其他语音：slide_duration + fade_duration + 实际语音时长
-                corrected_start = current_time + slide_duration + fade_duration
-                corrected_end = corrected_start + actual_duration
-                current_time += slide_duration + actual_duration + fade_duration
-
-            corrected_timestamps.append([corrected_start, corrected_end])
-
-            print(f"语音文件 {audio_file.name}:")
-            print(f"  实际语音时长: {actual_duration:.2f}s")
-            print(f"  修正时间轴: {corrected_start:.2f}s - {corrected_end:.2f}s")
-
+            durations[i] = _audio_duration(audio_file)
         except Exception as e:
             print(f"  无法读取语音文件 {audio_file}: {e}")
-            # 如果无法读取，使用原始时间轴或跳过
+            failed[i] = True
+            # 如果无法读取，使用原始时间轴（不推进时间）；没有原始时间轴则占用 1 秒
+            offsets[i] = 0.0
             if i < len(timestamps):
-                corrected_timestamps.append(timestamps[i])
+                keep_original[i] = True
             else:
-                # 如果没有原始时间轴，使用当前时间
-                corrected_timestamps.append([current_time, current_time + 1.0])
-                current_time += 1.0
+                durations[i] = 1.0
+
+    advance = np.where(keep_original, 0.0, offsets + durations)
+    starts = np.concatenate(([0.0], np.cumsum(advance)[:-1])) + offsets
+    ends = starts + durations
+    corrected_timestamps = [
+        timestamps[i] if keep_original[i] else [float(starts[i]), float(ends[i])] for i in range(n)
+    ]
+
+    for i, audio_file in enumerate(audio_files):
+        if failed[i]:
+            continue
+        print(f"语音文件 {audio_file.name}:")
+        print(f"  实际语音时长: {durations[i]:.2f}s")
+        print(f"  修正时间轴: {starts[i]:.2f}s - {ends[i]:.2f}s")
 
     print(f"✓ 时间轴修正完成，共 {len(corrected_timestamps)} 个语音文件")
     return corrected_timestamps
 
 
+def _format_srt_time(seconds: float) -> str:
+    """秒 -> SRT 时间戳 HH:MM:SS,mmm（整数毫秒运算，不构造 timedelta）"""
+    ms = int(round(seconds * 1000))
+    h, ms = divmod(ms, 3600_000)
+    m, ms = divmod(ms, 60_000)
+    s, ms = divmod(ms, 1000)
+    return f"{h:02}:{m:02}:{s:02},{ms:03}"
+
+
 def generate_srt_from_subtitle_items(subtitle_items: List, save_path: Union[str, Path]):
     """
     从 add_caption 生成的 subtitle_items 直接生成 SRT 文件，确保完全一致
     """
 
-    def format_time(seconds: float) -> str:
-        td = timedelta(seconds=seconds)
-        total_seconds = int(td.total_seconds())
-        millis = int((td.total_seconds() - total_seconds) * 1000)
-        hours, remainder = divmod(total_seconds, 3600)
-        minutes, seconds = divmod(remainder, 60)
-        return f"{hours:02}:{minutes:02}:{seconds:02},{millis:03}"
-
     srt_content = []
 
     print(f"从subtitle_items生成SRT文件：{len(subtitle_items)} 条字幕")
+    # 逐条日志只在 DEBUG 级别开启时格式化/输出
+    debug = logger.isEnabledFor(logging.DEBUG)
 
     for srt_index, ((start_time, end_time), text) in enumerate(subtitle_items, 1):
-        start_time_str = format_time(start_time)
-        end_time_str = format_time(end_time)
+        start_time_str = _format_srt_time(start_time)
+        end_time_str = _format_srt_time(end_time)
 
         srt_content.append(f"{srt_index}\n{start_time_str} --> {end_time_str}\n{text}\n\n")
-        print(f"  SRT {srt_index}: {start_time:.2f}s - {end_time:.2f}s: {text}")
+        if debug:
+            logger.debug(f"  SRT {srt_index}: {start_time:.2f}s - {end_time:.2f}s: {text}")
 
-    with open(save_path, 'w', encoding='utf-8') as srt_file:
-        srt_file.writelines(srt_content)
+    with open(save_path, 'w', encoding='utf-8', buffering=1 << 20) as srt_file:
+        srt_file.write(''.join(srt_content))
 
     print(f"SRT文件已保存到: {save_path} (共 {len(subtitle_items)} 条字幕)")
 
@@ -427,24 +639,23 @@ def generate_srt(timestamps: List,
                  caption_config: dict | None = None):
     """
     保留原函数用于向后兼容，但建议使用 generate_srt_from_subtitle_items
+
+    已弃用：会把 add_caption 的切分与计时重新算一遍；应直接把 add_caption 返回的
+    subtitle_items 交给 generate_srt_from_subtitle_items。
     """
+    warnings.warn("generate_srt() duplicates add_caption's work; pass add_caption's subtitle_items to "
+                  "generate_srt_from_subtitle_items() instead", DeprecationWarning, stacklevel=2)
     if caption_config is None:
         caption_config = {}
 
-    def format_time(seconds: float) -> str:
-        td = timedelta(seconds=seconds)
-        total_seconds = int(td.total_seconds())
-        millis = int((td.total_seconds() - total_seconds) * 1000)
-        hours, remainder = divmod(total_seconds, 3600)
-        minutes, seconds = divmod(remainder, 60)
-        return f"{hours:02}:{minutes:02}:{seconds:02},{millis:03}"
-
     srt_content = []
     num_caps = len(timestamps)
     srt_index = 1
 
     # 统一使用页面级处理，与add_caption函数保持一致
     print(f"生成SRT文件：{num_caps} 个页面（页面级处理）")
+    # 逐页/逐行日志只在 DEBUG 级别开启时格式化/输出
+    debug = logger.isEnabledFor(logging.DEBUG)
 
     for idx in range(num_caps):
         start_time, end_time = timestamps[idx]
@@ -458,7 +669,8 @@ def generate_srt(timestamps: List,
         if segmented_pages is not None:
             # 在segmented_pages流程中，每个caption就是一个完整的句子，不需要再切分
             caption_lines = [caption_text]
-            print(f"句子 {idx + 1}: 直接使用语音生成的句子（避免重复切分）")
+            if debug:
+                logger.debug(f"句子 {idx + 1}: 直接使用语音生成的句子（避免重复切分）")
         else:
             # 只有在传统页面级流程中才进行智能分割（按字符）
             max_chars = caption_config.get("max_chars_per_line")
@@ -469,7 +681,8 @@ def generate_srt(timestamps: List,
                 except Exception:
                     max_chars = 40
             caption_lines = split_caption_smart_chars(caption_text, max_chars=max_chars)
-            print(f"页面 {idx + 1}: 使用智能分割（按字符，每行≤{max_chars} 字符）")
+            if debug:
+                logger.debug(f"页面 {idx + 1}: 使用智能分割（按字符，每行≤{max_chars} 字符）")
 
         # 基于实际语音时长计算每行的时间分配，添加过渡时间
         total_duration = end_time - start_time
@@ -483,32 +696,118 @@ def generate_srt(timestamps: List,
         else:
             line_duration = total_duration
 
-        print(
-            f"页面 {idx + 1}: 语音时长 {total_duration:.2f}s, 分割为 {len(caption_lines)} 行, 每行显示 {line_duration:.2f}s, 过渡 {transition_duration:.2f}s")
+        if debug:
+            logger.debug(
+                f"页面 {idx + 1}: 语音时长 {total_duration:.2f}s, 分割为 {len(caption_lines)} 行, 每行显示 {line_duration:.2f}s, 过渡 {transition_duration:.2f}s")
 
         for line_idx, line in enumerate(caption_lines):
             # 计算每行的开始和结束时间，包含过渡
             line_start = start_time + (line_duration + transition_duration) * line_idx
             line_end = line_start + line_duration
 
-            start_time_str = format_time(line_start)
-            end_time_str = format_time(line_end)
+            start_time_str = _format_srt_time(line_start)
+            end_time_str = _format_srt_time(line_end)
 
             srt_content.append(f"{srt_index}\n{start_time_str} --> {end_time_str}\n{line}\n\n")
-            print(f"  SRT {srt_index}: {line_start:.2f}s - {line_end:.2f}s: {line} ({len(line.split())} 单词)")
+            if debug:
+                logger.debug(f"  SRT {srt_index}: {line_start:.2f}s - {line_end:.2f}s: {line} ({len(line.split())} 单词)")
             srt_index += 1
 
-    with open(save_path, 'w', encoding='utf-8') as srt_file:
-        srt_file.writelines(srt_content)
+    with open(save_path, 'w', encoding='utf-8', buffering=1 << 20) as srt_file:
+        srt_file.write(''.join(srt_content))
 
     print(f"SRT文件已保存到: {save_path} (共 {srt_index - 1} 条字幕)")
 
 
+@functools.lru_cache(maxsize=64)
+def _load_caption_font(font_path, fontsize: int):
+    """Parse a TTF once per (path, size); falls back to PIL's default font."""
+    try:
+        if font_path:
+            return ImageFont.truetype(font_path, fontsize)
+    except Exception:
+        pass
+    return ImageFont.load_default()
+
+
+# 每个线程/进程一份可复用的画布：测量用 1x1 画布 + 按需增长的 RGBA 草稿画布
+_caption_scratch = threading.local()
+
+
+def _caption_canvas(img_w: int, img_h: int):
+    """Return (scratch image, draw) at least img_w x img_h, cleared over the region about to be used."""
+    scratch = getattr(_caption_scratch, 'image', None)
+    if scratch is None or scratch.width < img_w or scratch.height < img_h:
+        w = max(img_w, scratch.width if scratch is not None else 0)
+        h = max(img_h, scratch.height if scratch is not None else 0)
+        scratch = Image.new('RGBA', (w, h), (0, 0, 0, 0))
+        _caption_scratch.image = scratch
+        _caption_scratch.draw = ImageDraw.Draw(scratch)
+        _caption_scratch.used = (0, 0)
+    else:
+        # 清除上一次绘制过的区域（字形可能越出其裁剪框）以及本次要用的区域
+        used_w, used_h = _caption_scratch.used
+        scratch.paste((0, 0, 0, 0), (0, 0, min(scratch.width, max(used_w, img_w)),
+                                     min(scratch.height, max(used_h, img_h))))
+    return scratch, _caption_scratch.draw
+
+
+def _caption_measure_draw():
+    draw = getattr(_caption_scratch, 'measure', None)
+    if draw is None:
+        draw = _caption_scratch.measure = ImageDraw.Draw(Image.new('L', (1, 1), 0))
+    return draw
+
+
+@functools.lru_cache(maxsize=4096)
+def _render_caption_image(text: str, font_path, fontsize: int, color) -> np.ndarray:
+    """Render text to an RGBA array using PIL, honoring font, fontsize and color.
+
+    Cached across add_caption calls, so repeated lines with the same style are rasterized once.
+    """
+    try:
+        fill_rgba = ImageColor.getrgb(color)
+        if len(fill_rgba) == 3:
+            fill_rgba = (*fill_rgba, 255)
+    except Exception:
+        fill_rgba = (255, 255, 255, 255)
+    # Padding around text
+    pad_x, pad_y = 20, 10
+    font = _load_caption_font(font_path, fontsize)
+    # Measure text box
+    draw = _caption_measure_draw()
+    # textbbox available in recent Pillow; fallback to textsize if needed
+    try:
+        text_bbox = draw.textbbox((0, 0), text, font=font)
+        text_w = max(1, text_bbox[2] - text_bbox[0])
+        text_h = max(1, text_bbox[3] - text_bbox[1])
+    except Exception:
+        text_w, text_h = draw.textsize(text, font=font)
+        text_bbox = (0, 0, text_w, text_h)
+    img_w = text_w + pad_x * 2
+    img_h = text_h + pad_y * 2
+    # Draw text on the reused transparent scratch canvas, then crop out the used region
+    scratch, draw = _caption_canvas(img_w, img_h)
+    draw.text((pad_x, pad_y), text, font=font, fill=fill_rgba)
+    # 字形可能越出 (img_w, img_h)（bbox 原点非零时），记录实际写过的范围供下次清除
+    _caption_scratch.used = (max(img_w, pad_x + text_bbox[2]), max(img_h, pad_y + text_bbox[3]))
+    # crop() 已是独立拷贝，asarray 直接复用其缓冲区，不再额外复制一次
+    return np.asarray(scratch.crop((0, 0, img_w, img_h)))
+
+
 def add_caption(captions: List,
                 timestamps: List,
                 video_clip: VideoClip,
                 segmented_pages: List = None,
                 **caption_config):
+    # 同一 clip + 相同参数的重复调用直接返回上次结果（记录在输入 clip 上，随 clip 一起释放；
+    # moviepy 的 with_* 会浅拷贝 __dict__，因此同时比较 id 以排除拷贝出的新 clip）
+    memo_key = (tuple(map(tuple, timestamps)), tuple(captions), repr(segmented_pages),
+                repr(sorted(caption_config.items())))
+    memo = getattr(video_clip, '_caption_memo', None)
+    if memo is not None and memo[0] == id(video_clip) and memo[1] == memo_key:
+        return memo[2]
+
     # Build subtitle timing and text - 使用智能分割，基于实际语音时长
     subtitle_items = []  # list of ((start, end), text)
     num_caps = len(timestamps)
@@ -562,69 +861,43 @@ def add_caption(captions: List,
     caption_config.pop('max_words_per_line', None)
 
     # Pre-render unique texts in parallel to speed up creation
-    unique_texts = sorted({text for _, text in subtitle_items})
+    unique_texts = list(dict.fromkeys(text for _, text in subtitle_items))
 
     # Number of parallel workers for text rendering
     workers = caption_config.get('workers', 1)
 
+    # Read style from caption_config once; rasterization is cached per (text, style)
+    font_path = caption_config.get('font') or caption_config.get('font_path')
+    fontsize = int(caption_config.get('fontsize', 32))
+    color_val = caption_config.get('color', 'white')
+    if isinstance(color_val, list):
+        color_val = tuple(color_val)  # cache keys must be hashable
+
     def render_text_clip(text: str):
-        # Render text to an image using PIL, honoring caption_config (font, fontsize, color)
-        from PIL import Image, ImageDraw, ImageFont, ImageColor
-        # Read style from caption_config
-        font_path = caption_config.get('font') or caption_config.get('font_path')
-        fontsize = int(caption_config.get('fontsize', 32))
-        color_val = caption_config.get('color', 'white')
-        try:
-            fill_rgba = ImageColor.getrgb(color_val)
-            if len(fill_rgba) == 3:
-                fill_rgba = (*fill_rgba, 255)
-        except Exception:
-            fill_rgba = (255, 255, 255, 255)
-        # Padding around text
-        pad_x, pad_y = 20, 10
-        # Select font
+        return ImageClip(_render_caption_image(text, font_path, fontsize, color_val))
+
+    # Each caption takes milliseconds to rasterize, so rendering stays in this process (and
+    # shares the _render_caption_image cache); workers > 1 spreads it over threads, each of
+    # which uses its own scratch canvas.
+    rendered = {}
+    num_workers = min(max(1, int(workers)), len(unique_texts))
+    if num_workers > 1:
         try:
-            if font_path:
-                font = ImageFont.truetype(font_path, fontsize)
-            else:
-                font = ImageFont.load_default()
+            with ThreadPoolExecutor(max_workers=num_workers, thread_name_prefix="caption") as executor:
+                arrays = executor.map(_render_caption_image, unique_texts,
+                                      repeat(font_path), repeat(fontsize), repeat(color_val))
+                rendered = dict(zip(unique_texts, arrays))
         except Exception:
-            font = ImageFont.load_default()
-        # Measure text box
-        dummy_img = Image.new('L', (1, 1), 0)
-        draw = ImageDraw.Draw(dummy_img)
-        # textbbox available in recent Pillow; fallback to textsize if needed
-        try:
-            text_bbox = draw.textbbox((0, 0), text, font=font)
-            text_w = max(1, text_bbox[2] - text_bbox[0])
-            text_h = max(1, text_bbox[3] - text_bbox[1])
-        except Exception:
-            text_w, text_h = draw.textsize(text, font=font)
-        img_w = text_w + pad_x * 2
-        img_h = text_h + pad_y * 2
-        # Draw text on transparent canvas
-        img = Image.new('RGBA', (img_w, img_h), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
-        draw.text((pad_x, pad_y), text, font=font, fill=fill_rgba)
-        # Convert to numpy array and wrap as ImageClip
-        arr = np.array(img)
-        return ImageClip(arr)
+            rendered = {}
 
     text_to_clip = {}
-    if unique_texts:
-        with ThreadPoolExecutor(max_workers=max(1, int(workers))) as executor:
-            futures = {executor.submit(render_text_clip, text): text for text in unique_texts}
-            for future in as_completed(futures):
-                text = futures[future]
-                try:
-                    text_to_clip[text] = future.result()
-                except Exception:
-                    # Fallback: create minimal clip on failure
-                    try:
-                        text_to_clip[text] = render_text_clip(text)
-                    except Exception:
-                        # As a last resort, skip this text
-                        text_to_clip[text] = render_text_clip("")
+    for text in unique_texts:
+        try:
+            arr = rendered.get(text)
+            text_to_clip[text] = ImageClip(arr) if arr is not None else render_text_clip(text)
+        except Exception:
+            # As a last resort, render an empty caption for this text
+            text_to_clip[text] = render_text_clip("")
 
     # Construct subtitles from text, using cached pre-rendered clips
     def make_textclip_from_cache(txt: str) -> ImageClip:
@@ -637,6 +910,7 @@ def add_caption(captions: List,
     subtitles = SubtitlesClip(subtitle_items, make_textclip=make_textclip_from_cache)
     captioned_clip = CompositeVideoClip([video_clip,
                                          subtitles.with_position(("center", "bottom"), relative=True)])
+    video_clip._caption_memo = (id(video_clip), memo_key, (captioned_clip, subtitle_items))
     return captioned_clip, subtitle_items
 
 
@@ -646,71 +920,75 @@ def split_keep_separator(text, separator):
     return pieces
 
 
+# 常见缩写词（其后的句号不作为断句点）
+_ABBREVIATIONS = list(dict.fromkeys([
+    'Dr', 'Mr', 'Mrs', 'Ms', 'Prof', 'Sr', 'Jr', 'Ltd', 'Inc', 'Corp', 'Co',
+    'St', 'Ave', 'Blvd', 'Rd', 'etc', 'vs', 'e.g', 'i.e', 'a.m', 'p.m',
+    'U.S', 'U.K', 'U.N', 'Ph.D', 'M.D', 'B.A', 'M.A', 'Ph.D',
+    'Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec',
+    'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun',
+    'No', 'Nos', 'Vol', 'Vols', 'pp', 'pgs', 'ch', 'chs', 'fig', 'figs', 'ref', 'refs',
+    'Gen', 'Lt', 'Col', 'Maj', 'Capt', 'Sgt', 'Cpl', 'Pvt',
+    'Rev', 'Hon', 'Rt', 'Gov', 'Sen', 'Rep', 'Pres', 'Vice', 'Adm',
+    'Assoc', 'Asst', 'Dir', 'Mgr', 'Exec', 'Admin',
+    'Dept', 'Div', 'Sect', 'Sub', 'Subj',
+    'Tech', 'Eng', 'Sci', 'Math', 'Econ', 'Psych', 'Sociol',
+    'Univ', 'Coll', 'Inst', 'Acad', 'Sch',
+    'Intl', 'Natl', 'Fed', 'Reg', 'Dist', 'Mun',
+    'Min', 'Max', 'Avg', 'Std', 'Var', 'Dev',
+    'Est', 'Aprox', 'Circa', 'ca'
+]))
+# 单个预编译的交替正则；长词在前，避免 "No" 抢先匹配 "Nos."
+_ABBR_RE = re.compile(
+    r'\b(' + '|'.join(re.escape(a) for a in sorted(_ABBREVIATIONS, key=len, reverse=True)) + r')\.'
+)
+_ABBR_INDEX = {a: i for i, a in enumerate(_ABBREVIATIONS)}
+_ABBR_MARKER_RE = re.compile(r'__ABBR_(\d+)__')
+
+
+# 一次线性扫描产出 (文本, 标点) 对，替代 re.split + 成对重组
+_SENTENCE_RE = re.compile(r'([^.!?]*)([.!?]+|\Z)')
+_CLAUSE_RE = re.compile(r'([^;:]*)([;:]+|\Z)')
+_COMMA_RE = re.compile(r'([^,]*)(,+|\Z)')
+
+
+def _split_keep_punct(pattern: re.Pattern, text: str) -> List[str]:
+    """按 pattern 切分并把标点保留在前一段末尾，丢弃空段"""
+    return [piece for m in pattern.finditer(text) if (piece := (m.group(1) + m.group(2)).strip())]
+
+
+def _protect_abbreviations(text: str) -> str:
+    """把 "缩写." 替换为不含标点的占位符，一次扫描完成"""
+    return _ABBR_RE.sub(lambda m: f"__ABBR_{_ABBR_INDEX[m.group(1)]}__", text)
+
+
+def _restore_abbreviations(text: str) -> str:
+    return _ABBR_MARKER_RE.sub(lambda m: _ABBREVIATIONS[int(m.group(1))] + '.', text)
+
+
 def split_text_for_speech(text, max_words=20):
     """
     为语音生成切分文本, 优先保持完整句子。每句不超过max_words个单词
     这是专门用于语音生成时的文本切分算法，优先保持句子的完整性
     改进版本：正确处理缩写词，避免在缩写词后错误分割
     """
-    import re
 
     if not text or not text.strip():
         return []
 
-    # 定义常见的缩写词（不在此处分割）
-    common_abbreviations = [
-        'Dr', 'Mr', 'Mrs', 'Ms', 'Prof', 'Sr', 'Jr', 'Ltd', 'Inc', 'Corp', 'Co',
-        'St', 'Ave', 'Blvd', 'Rd', 'etc', 'vs', 'e.g', 'i.e', 'a.m', 'p.m',
-        'U.S', 'U.K', 'U.N', 'Ph.D', 'M.D', 'B.A', 'M.A', 'Ph.D',
-        'Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec',
-        'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun',
-        'No', 'Nos', 'Vol', 'Vols', 'pp', 'pgs', 'ch', 'chs', 'fig', 'figs', 'ref', 'refs',
-        'Gen', 'Lt', 'Col', 'Maj', 'Capt', 'Sgt', 'Cpl', 'Pvt',
-        'Rev', 'Hon', 'Rt', 'Gov', 'Sen', 'Rep', 'Pres', 'Vice', 'Adm',
-        'Assoc', 'Asst', 'Dir', 'Mgr', 'Exec', 'Admin',
-        'Dept', 'Div', 'Sect', 'Sub', 'Subj',
-        'Tech', 'Eng', 'Sci', 'Math', 'Econ', 'Psych', 'Sociol',
-        'Univ', 'Coll', 'Inst', 'Acad', 'Sch',
-        'Intl', 'Natl', 'Fed', 'Reg', 'Dist', 'Mun',
-        'Min', 'Max', 'Avg', 'Std', 'Var', 'Dev',
-        'Est', 'Aprox', 'Circa', 'ca'
-    ]
 
     # 预处理：保护缩写词，用特殊标记替换
-    protected_text = text
-    abbreviation_markers = {}
-
-    for i, abbr in enumerate(common_abbreviations):
-        # 查找缩写词后跟句号的模式
-        pattern = re.escape(abbr) + r'\.'
-        if re.search(pattern, protected_text):
-            marker = f"__ABBR_{i}__"
-            abbreviation_markers[marker] = abbr + '.'
-            protected_text = re.sub(pattern, marker, protected_text)
+    protected_text = _protect_abbreviations(text)
 
     # 第一步：按强标点符号分割，保持标点符号
-    sentences = re.split(r'([.!?]+)', protected_text)
-    # 重新组合句子和标点符号
-    complete_sentences = []
-    for i in range(0, len(sentences) - 1, 2):
-        if i + 1 < len(sentences):
-            sentence = (sentences[i] + sentences[i + 1]).strip()
-            if sentence:
-                complete_sentences.append(sentence)
-
-    # 处理最后一部分（如果没有强标点符号结尾）
-    if len(sentences) % 2 == 1 and sentences[-1].strip():
-        complete_sentences.append(sentences[-1].strip())
+    complete_sentences = _split_keep_punct(_SENTENCE_RE, protected_text)
 
     # 如果没有找到强标点符号，将整个文本作为一个句子
     if not complete_sentences:
         complete_sentences = [protected_text.strip()]
 
     # 恢复缩写词标记
-    for i, sentence in enumerate(complete_sentences):
-        for marker, original in abbreviation_markers.items():
-            sentence = sentence.replace(marker, original)
-        complete_sentences[i] = sentence
+    complete_sentences = [_restore_abbreviations(sentence) for sentence in complete_sentences]
 
     # 检查是否所有句子都很短，如果是则不进行切分
     all_sentences_short = all(len(sentence.split()) <= max_words for sentence in complete_sentences)
@@ -734,38 +1012,16 @@ def split_text_for_speech(text, max_words=20):
             # 句子太长，需要进一步分割
             # 第二步：尝试按中等标点符号分割
             # 先保护当前句子中的缩写词
-            protected_sentence = sentence
-            sentence_abbreviation_markers = {}
-
-            for i, abbr in enumerate(common_abbreviations):
-                pattern = re.escape(abbr) + r'\.'
-                if re.search(pattern, protected_sentence):
-                    marker = f"__SENT_ABBR_{i}__"
-                    sentence_abbreviation_markers[marker] = abbr + '.'
-                    protected_sentence = re.sub(pattern, marker, protected_sentence)
-
-            sub_sentences = re.split(r'([;:]+)', protected_sentence)
-            # 重新组合子句和标点符号
-            complete_sub_sentences = []
-            for i in range(0, len(sub_sentences) - 1, 2):
-                if i + 1 < len(sub_sentences):
-                    sub_sentence = (sub_sentences[i] + sub_sentences[i + 1]).strip()
-                    if sub_sentence:
-                        complete_sub_sentences.append(sub_sentence)
-
-            # 处理最后一部分（如果没有中等标点符号结尾）
-            if len(sub_sentences) % 2 == 1 and sub_sentences[-1].strip():
-                complete_sub_sentences.append(sub_sentences[-1].strip())
+            protected_sentence = _protect_abbreviations(sentence)
+
+            complete_sub_sentences = _split_keep_punct(_CLAUSE_RE, protected_sentence)
 
             # 如果没有找到中等标点符号，将原句作为一个子句
             if not complete_sub_sentences:
                 complete_sub_sentences = [protected_sentence]
 
             # 恢复子句中的缩写词
-            for i, sub_sentence in enumerate(complete_sub_sentences):
-                for marker, original in sentence_abbreviation_markers.items():
-                    sub_sentence = sub_sentence.replace(marker, original)
-                complete_sub_sentences[i] = sub_sentence
+            complete_sub_sentences = [_restore_abbreviations(sub) for sub in complete_sub_sentences]
 
             for sub_sentence in complete_sub_sentences:
                 sub_words = sub_sentence.split()
@@ -774,38 +1030,16 @@ def split_text_for_speech(text, max_words=20):
                 else:
                     # 第三步：按弱标点符号分割
                     # 先保护当前子句中的缩写词
-                    protected_sub_sentence = sub_sentence
-                    sub_sentence_abbreviation_markers = {}
-
-                    for i, abbr in enumerate(common_abbreviations):
-                        pattern = re.escape(abbr) + r'\.'
-                        if re.search(pattern, protected_sub_sentence):
-                            marker = f"__SUB_ABBR_{i}__"
-                            sub_sentence_abbreviation_markers[marker] = abbr + '.'
-                            protected_sub_sentence = re.sub(pattern, marker, protected_sub_sentence)
-
-                    comma_parts = re.split(r'([,]+)', protected_sub_sentence)
-                    # 重新组合部分和逗号
-                    complete_comma_parts = []
-                    for i in range(0, len(comma_parts) - 1, 2):
-                        if i + 1 < len(comma_parts):
-                            part = (comma_parts[i] + comma_parts[i + 1]).strip()
-                            if part:
-                                complete_comma_parts.append(part)
-
-                    # 处理最后一部分（如果没有逗号结尾）
-                    if len(comma_parts) % 2 == 1 and comma_parts[-1].strip():
-                        complete_comma_parts.append(comma_parts[-1].strip())
+                    protected_sub_sentence = _protect_abbreviations(sub_sentence)
+
+                    complete_comma_parts = _split_keep_punct(_COMMA_RE, protected_sub_sentence)
 
                     # 如果没有找到逗号，将原子句作为一个部分
                     if not complete_comma_parts:
                         complete_comma_parts = [protected_sub_sentence]
 
                     # 恢复逗号分割中的缩写词
-                    for i, part in enumerate(complete_comma_parts):
-                        for marker, original in sub_sentence_abbreviation_markers.items():
-                            part = part.replace(marker, original)
-                        complete_comma_parts[i] = part
+                    complete_comma_parts = [_restore_abbreviations(part) for part in complete_comma_parts]
 
                     # 尝试合并短的部分，形成更长的段落
                     current_segment = ""
@@ -855,6 +1089,34 @@ def split_text_for_speech(text, max_words=20):
     return result_segments
 
 
+# 字幕断句标点：强 -> 中 -> 弱（';' 同时属于中/弱时按中处理）；匹配到的分组号即类别，
+# _CAPTION_BREAK_RATIO[分组号] 为该类别触发断句所需的行长比例
+_CAPTION_BREAK_RE = re.compile(r'([。！？.!?])|([；;：:])|([，,、])')
+_CAPTION_BREAK_RATIO = (None, 0.5, 0.7, 0.9)
+# 纯 ASCII 文本的类别表：bytes.translate 一次得到每个字节的类别（0 = 非断点）
+_CAPTION_ASCII_CLASS = bytes(
+    1 if c in b'.!?' else 2 if c in b';:' else 3 if c in b',' else 0 for c in range(256)
+)
+
+
+def _split_caption_ascii(text: str, max_chars: int, thresholds: List[int]) -> List[str]:
+    """ASCII fast path of split_caption_smart_chars: same cuts, found with C-level bytes.find."""
+    classes = text.encode('ascii').translate(_CAPTION_ASCII_CLASS)
+    n = len(text)
+    pieces = []
+    start = 0
+    while start < n:
+        # 最早满足「该类别断点处行长 >= 阈值」的断点；都没有则在 max_chars 处硬切（或取到结尾）
+        cut = min(start + max_chars, n)
+        for cls in (1, 2, 3):
+            j = classes.find(cls, start + thresholds[cls] - 1, cut)
+            if j != -1:
+                cut = j + 1
+        pieces.append(text[start:cut])
+        start = cut
+    return pieces
+
+
 def split_caption_smart_chars(text: str, max_chars: int = 40) -> List[str]:
     """
     按“字符”为最小单位的智能字幕分割：
@@ -866,57 +1128,29 @@ def split_caption_smart_chars(text: str, max_chars: int = 40) -> List[str]:
     if not text:
         return []
 
-    # 定义分隔优先级：强 -> 中 -> 弱
-    strong = set(list("。！？.!?"))
-    medium = set(list("；;：:"))
-    weak = set(list("，,、;"))
-
+    # 每个断点之前的长度达到对应比例即断句，行长达到 max_chars 则硬切
+    thresholds = [max_chars] + [max(1, int(max_chars * ratio)) for ratio in _CAPTION_BREAK_RATIO[1:]]
+    if text.isascii():
+        return _split_caption_ascii(text, max_chars, thresholds)
     pieces = []
-    buf = ""
-
-    def flush_buffer():
-        nonlocal buf
-        while buf:
-            if len(buf) <= max_chars:
-                pieces.append(buf)
-                buf = ""
-                break
-            else:
-                # 尝试在 max_chars 范围内寻找最近的空格或自然分隔
-                cut = -1
-                # 优先找强/中/弱标点作为切分点
-                for i in range(min(len(buf), max_chars), 0, -1):
-                    ch = buf[i - 1]
-                    if ch in strong or ch in medium or ch in weak or ch.isspace():
-                        cut = i
-                        break
-                if cut == -1:
-                    cut = max_chars
-                pieces.append(buf[:cut])
-                buf = buf[cut:]
-
-    for ch in text:
-        buf += ch
-        if len(buf) >= max_chars:
-            # 达到上限，优先在标点处分割
-            flush_buffer()
-            continue
-        # 若遇到强/中/弱标点且当前长度达到一定比例，进行自然断句
-        if ch in strong:
-            if len(buf) >= max(1, int(max_chars * 0.5)):
-                flush_buffer()
-        elif ch in medium:
-            if len(buf) >= max(1, int(max_chars * 0.7)):
-                flush_buffer()
-        elif ch in weak:
-            if len(buf) >= max(1, int(max_chars * 0.9)):
-                flush_buffer()
-
-    if buf:
-        flush_buffer()
+    start = 0
+    for m in _CAPTION_BREAK_RE.finditer(text):
+        end = m.end()
+        while end - start > max_chars:
+            pieces.append(text[start:start + max_chars])
+            start += max_chars
+        length = end - start
+        if length >= max_chars or length >= thresholds[m.lastindex]:
+            pieces.append(text[start:end])
+            start = end
+    while len(text) - start > max_chars:
+        pieces.append(text[start:start + max_chars])
+        start += max_chars
+    if start < len(text):
+        pieces.append(text[start:])
 
     # 保留原始字符，不去除空白，确保拼接后与原文一致
-    return [p for p in pieces if p != ""]
+    return pieces
 
 
 def split_caption(caption, max_length=30):
@@ -928,6 +1162,12 @@ def split_caption(caption, max_length=30):
     return '\n'.join(lines)
 
 
+@functools.lru_cache(maxsize=8)
+def _black_clip(width: int, height: int) -> ColorClip:
+    """Shared black ColorClip per size without a duration; callers take a copy via with_duration()."""
+    return ColorClip(size=(width, height), color=(0, 0, 0))
+
+
 def add_bottom_black_area(clip: VideoFileClip,
                           black_area_height: int = 64):
     """
@@ -940,7 +1180,7 @@ def add_bottom_black_area(clip: VideoFileClip,
     Returns:
         VideoFileClip: Processed video clip.
     """
-    black_bar = ColorClip(size=(clip.w, black_area_height), color=(0, 0, 0), duration=clip.duration)
+    black_bar = _black_clip(clip.w, black_area_height).with_duration(clip.duration)
     extended_clip = CompositeVideoClip([clip, black_bar.with_position(("center", "bottom"))])
     return extended_clip
 
@@ -967,10 +1207,20 @@ def add_move_effect(clip, direction="left", move_raito=0.95):
         end_position = (0, 0)
 
     duration = clip.duration
-    moving_clip = clip.with_position(
-        lambda t: (start_position[0] + (
-                end_position[0] - start_position[0]) / duration * t, start_position[1])
-    )
+    fps = clip.fps
+    if fps:
+        # 轨迹按帧预先算好，渲染时只做一次下标查表（t 取最近的帧）
+        n = int(duration * fps) + 1
+        xs = start_position[0] + (end_position[0] - start_position[0]) / duration * (np.arange(n) / fps)
+        positions = list(zip(xs.tolist(), repeat(start_position[1])))
+        moving_clip = clip.with_position(
+            lambda t, _p=positions, _fps=fps, _last=n - 1: _p[min(round(t * _fps), _last)]
+        )
+    else:
+        moving_clip = clip.with_position(
+            lambda t: (start_position[0] + (
+                    end_position[0] - start_position[0]) / duration * t, start_position[1])
+        )
 
     final_clip = CompositeVideoClip([moving_clip], size=(orig_width, orig_height))
 
@@ -1012,6 +1262,75 @@ def add_slide_effect(clips, slide_duration):
     return video
 
 
+@functools.lru_cache(maxsize=32)
+def _fitted_frame_cached(image_file: str, mtime_ns: int, size: int, target_width: int, target_height: int) -> np.ndarray:
+    """Decode an image and resize it to fit the target canvas with a single Pillow resample (read-only array)."""
+    with Image.open(image_file) as im:
+        # 保留透明通道（ImageClip 会据此生成 mask），否则统一为 RGB
+        im = im.convert('RGBA' if 'A' in im.getbands() or 'transparency' in im.info else 'RGB')
+    # Fit image into target canvas without stretching (letterbox if needed)
+    scale = min(target_width / im.width, target_height / im.height)
+    new_w, new_h = int(im.width * scale), int(im.height * scale)
+    if (new_w, new_h) != im.size:
+        im = im.resize((new_w, new_h), Image.Resampling.LANCZOS)
+    arr = np.asarray(im)
+    arr.setflags(write=False)
+    return arr
+
+
+def _letterbox_layers(image_file, target_width, target_height):
+    """Decode and fit an image into the target canvas once; returns (fitted image, black background).
+
+    Both layers carry no duration, so one page's layers can be reused by all of its sentences.
+    """
+    st = os.stat(image_file)
+    fitted = _fitted_frame_cached(str(image_file), st.st_mtime_ns, st.st_size, target_width, target_height)
+    return ImageClip(fitted), _black_clip(target_width, target_height)
+
+
+def _effect_choices(n: int) -> np.ndarray:
+    """Draw n random effect choices in one call (see _build_image_clip for the bit layout).
+
+    Seeded from the global ``random`` so random.seed() still makes compose_video reproducible.
+    """
+    return np.random.default_rng(random.getrandbits(64)).integers(0, 8, size=n, dtype=np.uint8)
+
+
+def _build_image_clip(layers, duration, fps, zoom_speed, move_ratio, choice):
+    """Compose letterbox ``layers`` for ``duration`` and apply the zoom/move effect encoded in ``choice``.
+
+    ``choice`` bits: 1 -> zoom (else move), 2 -> zoom in (else out), 4 -> move left (else right).
+    """
+    fitted_clip, bg = layers
+    fitted_clip = fitted_clip.with_duration(duration).with_fps(fps)
+    image_clip = CompositeVideoClip([bg.with_duration(duration), fitted_clip.with_position('center')])
+
+    if choice & 1:  # zoom in or zoom out
+        zoom_mode = "in" if choice & 2 else "out"
+        image_clip = add_zoom_effect(image_clip, zoom_speed, zoom_mode, fps=fps)
+    else:  # move left or right
+        direction = "left" if choice & 4 else "right"
+        image_clip = add_move_effect(image_clip, direction=direction, move_raito=move_ratio)
+    return image_clip
+
+
+def _build_sentence_clip(audio_path, layers, choice, *, audio_sample_rate, fade_silence, fps, zoom_speed, move_ratio):
+    """Build one sentence's clip; returns (video_clip, actual speech duration without the fades)."""
+    # 加载音频并获取实际时长
+    samples = _load_stereo_samples(audio_path, audio_sample_rate)
+    actual_audio_duration = samples.shape[0] / audio_sample_rate
+
+    # 添加淡入淡出效果（一次 np.concatenate 得到单个 AudioArrayClip）
+    speech_clip = _concat_audio_arrays([fade_silence, samples, fade_silence], audio_sample_rate)
+
+    # 加载对应的图像（使用页面图像），添加预先抽好的视觉效果
+    image_clip = _build_image_clip(layers, speech_clip.duration, fps, zoom_speed, move_ratio, choice)
+
+    # 确保音频有正确的采样率
+    audio_clip = speech_clip.with_fps(audio_sample_rate)
+    return image_clip.with_audio(audio_clip), actual_audio_duration
+
+
 def compose_video(story_dir: Union[str, Path],
                   save_path: Union[str, Path],
                   captions: List,
@@ -1038,149 +1357,90 @@ def compose_video(story_dir: Union[str, Path],
     timestamps = []
     actual_audio_durations = []  # 用于存储每个片段的真实音频时长
 
+    # Stereo silence (avoids channel mismatches), allocated once and shared read-only by every page/sentence
+    slide_silence_array = np.zeros((int(audio_sample_rate * slide_duration), 2), dtype=np.float32)
+    fade_silence_array = np.zeros((int(audio_sample_rate * fade_duration), 2), dtype=np.float32)
+    slide_silence_array.setflags(write=False)
+    fade_silence_array.setflags(write=False)
+
     # 新的逻辑：按句子处理音频，而不是按页面
     if segmented_pages is not None:
         # 使用新的按句子处理逻辑
         print("使用新的按句子处理逻辑")
         audio_file_counter = 1
 
+        # 先按顺序确定每个句子对应的语音/图像文件（缺失的语音不占用编号）
+        jobs = []
+        existing_wavs = {path.name for path in _numbered_wavs(speech_dir)}  # 一次 scandir 代替逐句 exists()
         for page_idx, segments in enumerate(segmented_pages):
-            for _, segment in enumerate(segments):
+            for _ in segments:
                 # 为每个句子创建视频片段
-                audio_filename = f"s{audio_file_counter}.wav"
-                audio_file_path = speech_dir / audio_filename
-
-                if audio_file_path.exists():
-                    # 加载音频并获取实际时长
-                    speech_clip = _load_wav_as_stereo_clip(str(audio_file_path), audio_sample_rate)
-                    actual_audio_duration = speech_clip.duration
-
-                    # 添加淡入淡出效果
-                    fade_silence_array = np.zeros((int(audio_sample_rate * fade_duration), 2), dtype=np.float32)
-                    fade_silence = AudioArrayClip(fade_silence_array, fps=audio_sample_rate)
-                    speech_clip = concatenate_audioclips([fade_silence, speech_clip, fade_silence])
-
-                    actual_audio_durations.append(actual_audio_duration)  # 存储真实音频时长，后续统一计算
-
-                    # 加载对应的图像（使用页面图像）
-                    image_file = (image_dir / f"./p{page_idx + 1}.png").__str__()
-                    image_clip = ImageClip(image_file)
-                    image_clip = image_clip.with_duration(speech_clip.duration).with_fps(fps)
-
-                    # Fit image into target canvas without stretching (letterbox if needed)
-                    img_w, img_h = image_clip.size
-                    scale = min(target_width / img_w, target_height / img_h)
-                    new_w, new_h = int(img_w * scale), int(img_h * scale)
-                    fitted_clip = image_clip.resized(width=new_w, height=new_h)
-                    bg = ColorClip(size=(target_width, target_height), color=(0, 0, 0)).with_duration(
-                        fitted_clip.duration)
-                    image_clip = CompositeVideoClip([bg, fitted_clip.with_position('center')])
-                    image_clip = image_clip
-
-                    # 添加视觉效果
-                    if random.random() <= 0.5:  # zoom in or zoom out
-                        if random.random() <= 0.5:
-                            zoom_mode = "in"
-                        else:
-                            zoom_mode = "out"
-                        image_clip = add_zoom_effect(image_clip, zoom_speed, zoom_mode, fps=fps)
-                    else:  # move left or right
-                        if random.random() <= 0.5:
-                            direction = "left"
-                        else:
-                            direction = "right"
-                        image_clip = add_move_effect(image_clip, direction=direction, move_raito=move_ratio)
-
-                    # 确保音频有正确的采样率
-                    audio_clip = speech_clip.with_fps(audio_sample_rate)
-
-                    video_clip = image_clip.with_audio(audio_clip)
-                    video_clips.append(video_clip)
-
+                audio_file_path = speech_dir / f"s{audio_file_counter}.wav"
+                if audio_file_path.name in existing_wavs:
+                    jobs.append((str(audio_file_path), page_idx))
                     audio_file_counter += 1
                 else:
                     print(f"  警告：音频文件不存在 {audio_file_path}")
+
+        # 句子之间相互独立，耗时主要在 WAV 读取与 PNG 解码（释放 GIL），用线程池并行构建，按提交顺序收集
+        # 同一页的句子共用一张图：每页只解码/缩放一次 PNG，句子只按各自时长组合
+        build = functools.partial(_build_sentence_clip, audio_sample_rate=audio_sample_rate,
+                                  fade_silence=fade_silence_array, fps=fps, zoom_speed=zoom_speed, move_ratio=move_ratio)
+        with ThreadPoolExecutor(max_workers=max(1, min(len(jobs), os.cpu_count() or 1))) as executor:
+            pages = list(dict.fromkeys(page_idx for _, page_idx in jobs))
+            page_layers = dict(zip(pages, executor.map(
+                lambda idx: _letterbox_layers((image_dir / f"./p{idx + 1}.png").__str__(), target_width,
+                                              target_height), pages)))
+            # 所有句子的效果一次性抽取，不再每句多次调用 random
+            futures = [executor.submit(build, audio_path, page_layers[page_idx], int(choice))
+                       for (audio_path, page_idx), choice in zip(jobs, _effect_choices(len(jobs)))]
+            for fut in futures:
+                video_clip, actual_audio_duration = fut.result()
+                video_clips.append(video_clip)
+                actual_audio_durations.append(actual_audio_duration)  # 存储真实音频时长，后续统一计算
     else:
         # 回退到原来的按页面处理逻辑
         print("使用原来的按页面处理逻辑")
         cur_duration = 0.0  # 累计当前已添加到时间线的总时长
+        choices = _effect_choices(num_pages)
+        # 一次扫描语音目录，按页分组（替代每页的 exists() + glob）
+        single_speech, multi_speech = _page_speech_files(speech_dir)
         for page in trange(1, num_pages + 1):
             # speech track
-            # Create stereo silence to avoid channel mismatches
-            slide_silence_array = np.zeros((int(audio_sample_rate * slide_duration), 2), dtype=np.float32)
-            fade_silence_array = np.zeros((int(audio_sample_rate * fade_duration), 2), dtype=np.float32)
-            slide_silence = AudioArrayClip(slide_silence_array, fps=audio_sample_rate)
-            fade_silence = AudioArrayClip(fade_silence_array, fps=audio_sample_rate)
-
             # Calculate the start time for this page's speech content (excluding effects)
             page_speech_start = cur_duration
 
-            if (speech_dir / f"p{page}.wav").exists():  # single speech file
-                single_utterance = True
-                speech_file = (speech_dir / f"./p{page}.wav").__str__()
-                original_speech_clip = _load_wav_as_stereo_clip(speech_file, audio_sample_rate)
-
-                # Add fade effects to speech
-                speech_clip = concatenate_audioclips([fade_silence, original_speech_clip, fade_silence])
+            if page in single_speech:  # single speech file
+                speech_file = single_speech[page]
+                speech_arrays = [_load_stereo_samples(speech_file, audio_sample_rate)]
 
             else:  # multiple speech files
-                single_utterance = False
-                speech_files = list(speech_dir.glob(f"s{page}_*.wav"))
-                speech_files = sorted(speech_files, key=lambda x: int(x.stem.split("_")[-1]))
-                speech_clips = []
-
-                for speech_file in speech_files:
-                    temp_clip = _load_wav_as_stereo_clip(speech_file.__str__(), audio_sample_rate)
-                    speech_clips.append(temp_clip)
-
-                speech_clip = concatenate_audioclips([fade_silence] + speech_clips + [fade_silence])
+                speech_files = multi_speech.get(page, [])
+                speech_arrays = [_load_stereo_samples(speech_file.__str__(), audio_sample_rate)
+                                 for speech_file in speech_files]
                 speech_file = speech_files[0]  # for energy calculation
 
-            # Add slide silence and update duration
+            # Add fade effects to speech, then slide silence; one np.concatenate instead of nested audio clips
             if page == 1:
-                speech_clip = concatenate_audioclips([speech_clip, slide_silence])
+                speech_clip = _concat_audio_arrays([fade_silence_array, *speech_arrays, fade_silence_array,
+                                                    slide_silence_array], audio_sample_rate)
                 # For first page: timestamp starts after the initial slide silence
                 speech_start_time = page_speech_start + slide_duration
             else:
-                speech_clip = concatenate_audioclips([slide_silence, speech_clip, slide_silence])
+                speech_clip = _concat_audio_arrays([slide_silence_array, fade_silence_array, *speech_arrays,
+                                                    fade_silence_array, slide_silence_array], audio_sample_rate)
                 # For other pages: timestamp starts after slide silence + fade silence
                 speech_start_time = page_speech_start + slide_duration + fade_duration
 
             # Calculate the actual speech duration (excluding fade effects)
-            if single_utterance:
-                actual_speech_duration = original_speech_clip.duration
-            else:
-                actual_speech_duration = sum(temp_clip.duration for temp_clip in speech_clips)
+            actual_speech_duration = sum(arr.shape[0] for arr in speech_arrays) / audio_sample_rate
 
             actual_audio_durations.append(actual_speech_duration)  # 存储真实音频时长，后续统一计算
 
             # set image as the main content, align the duration
             image_file = (image_dir / f"./p{page}.png").__str__()
-            image_clip = ImageClip(image_file)
-            image_clip = image_clip.with_duration(speech_clip.duration).with_fps(fps)
-
-            # Fit image into target canvas without stretching (letterbox if needed)
-            img_w, img_h = image_clip.size
-            scale = min(target_width / img_w, target_height / img_h)
-            new_w, new_h = int(img_w * scale), int(img_h * scale)
-            fitted_clip = image_clip.resized(width=new_w, height=new_h)
-            bg = ColorClip(size=(target_width, target_height), color=(0, 0, 0)).with_duration(fitted_clip.duration)
-            image_clip = CompositeVideoClip([bg, fitted_clip.with_position('center')])
-            # Crossfade not available on CompositeVideoClip in this environment; no-op
-            image_clip = image_clip
-
-            if random.random() <= 0.5:  # zoom in or zoom out
-                if random.random() <= 0.5:
-                    zoom_mode = "in"
-                else:
-                    zoom_mode = "out"
-                image_clip = add_zoom_effect(image_clip, zoom_speed, zoom_mode, fps=fps)
-            else:  # move left or right
-                if random.random() <= 0.5:
-                    direction = "left"
-                else:
-                    direction = "right"
-                image_clip = add_move_effect(image_clip, direction=direction, move_raito=move_ratio)
+            image_clip = _build_image_clip(_letterbox_layers(image_file, target_width, target_height),
+                                           speech_clip.duration, fps, zoom_speed, move_ratio, int(choices[page - 1]))
 
             # Ensure audio has consistent sample rate (already set above)
             audio_clip = speech_clip.with_fps(audio_sample_rate)
@@ -1203,33 +1463,31 @@ def compose_video(story_dir: Union[str, Path],
     # composite_clip.clips 包含了所有经过转场效果计算后的子片段
     # 我们需要确保这里的片段顺序和我们之前记录的 actual_audio_durations 顺序一致
     if len(composite_clip.clips) == len(actual_audio_durations):
-        for i, subclip in enumerate(composite_clip.clips):
-            actual_audio_duration = actual_audio_durations[i]
-
-            # 计算语音在子片段中的实际开始时间
-            # MoviePy的 subclip.start 是整个片段（含静音转场）的开始时间
-            if i == 0:
-                # 第一个片段只有淡入
-                speech_start_time = subclip.start + fade_duration
-            else:
-                # 后续片段有转场+淡入
-                # 注意：add_slide_effect 的实现已经将 slide_duration 包含在了 subclip.start 中
-                # 我们创建的 video_clips 音频部分是 [fade, audio, fade]，所以语音总是从 fade_duration 之后开始
-                speech_start_time = subclip.start + fade_duration
-
-            speech_end_time = speech_start_time + actual_audio_duration
-            timestamps.append([speech_start_time, speech_end_time])
-            print(f"片段 {i + 1}: 精确语音时间轴 [{speech_start_time:.3f}s - {speech_end_time:.3f}s]")
+        # MoviePy 的 subclip.start 是整个片段（含静音转场）的开始时间；add_slide_effect 已把 slide_duration
+        # 计入 start，而每个片段的音频都是 [fade, audio, fade]，所以语音总是从 start + fade_duration 开始
+        starts = np.fromiter((c.start for c in composite_clip.clips), dtype=np.float64,
+                             count=len(actual_audio_durations)) + fade_duration
+        ends = starts + np.asarray(actual_audio_durations, dtype=np.float64)
+        timestamps = np.column_stack([starts, ends]).tolist()
+        if timestamps:
+            print(f"共 {len(timestamps)} 个片段: 精确语音时间轴 [{starts[0]:.3f}s - {ends[-1]:.3f}s]")
+        if logger.isEnabledFor(logging.DEBUG):
+            for i, (start, end) in enumerate(timestamps, 1):
+                logger.debug(f"片段 {i}: 精确语音时间轴 [{start:.3f}s - {end:.3f}s]")
     else:
         print(
             f"❌ 错误：合成后的片段数量 ({len(composite_clip.clips)}) 与音频数量 ({len(actual_audio_durations)}) 不匹配！")
         # 此处可以考虑是否抛出异常或使用旧逻辑作为回退
 
     # --- 精确时间戳提取完毕 ---
-    # Ensure final composite has the exact target size
-    bg = ColorClip(size=(target_width, target_height), color=(0, 0, 0)).with_duration(composite_clip.duration)
-    composite_clip = CompositeVideoClip([bg, composite_clip.with_position('center')])
-    composite_clip = add_bottom_black_area(composite_clip, black_area_height=caption_config["area_height"])
+    # Ensure final composite has the exact target size and reserve the bottom caption area; the background,
+    # the slideshow and the black caption bar share one CompositeVideoClip (same result as wrapping the
+    # canvas in add_bottom_black_area, one nesting level less to evaluate per frame)
+    duration = composite_clip.duration
+    bg = _black_clip(target_width, target_height).with_duration(duration)
+    black_bar = _black_clip(target_width, caption_config["area_height"]).with_duration(duration)
+    composite_clip = CompositeVideoClip([bg, composite_clip.with_position('center'),
+                                         black_bar.with_position(("center", "bottom"))])
     del caption_config["area_height"]
     max_caption_length = caption_config["max_length"]
     del caption_config["max_length"]
@@ -1319,8 +1577,8 @@ def compose_video(story_dir: Union[str, Path],
     if not enable_captions:
         print("Captions disabled - generating video without subtitles")
 
-    # Write video with audio using improved method
-    temp_video_path = save_path.__str__().replace('.mp4', '_temp_video.mp4')
+    # Write video with audio using improved method: audio is rendered to a temp WAV, then frames are
+    # piped into a single FFmpeg run that encodes the video and muxes the WAV straight into save_path
     temp_audio_path = save_path.__str__().replace('.mp4', '_temp_audio.wav')
 
     try:
@@ -1334,14 +1592,13 @@ def compose_video(story_dir: Union[str, Path],
         print(f"Audio clip duration: {audio_clip.duration:.2f}s")
         print(f"Audio clip fps: {audio_clip.fps}")
         print(f"Writing audio to: {temp_audio_path}")
-        print(f"Writing video to: {temp_video_path}")
         print(f"Final output: {save_path}")
 
-        # 分别处理音频、视频和合并，每个都有独立的进度显示
+        # 分别处理音频与视频（视频编码时直接封装音轨），每个都有独立的进度显示
 
         # 1. 写入音频文件
         print("=" * 50)
-        print("步骤 1/3: 写入音频文件")
+        print("步骤 1/2: 写入音频文件")
         print("=" * 50)
 
         try:
@@ -1363,121 +1620,33 @@ def compose_video(story_dir: Union[str, Path],
             )
             print("✓ 音频文件写入完成（备用方法）")
 
-        # 2. 写入视频文件（以帧为单位显示进度）
+        if not os.path.exists(temp_audio_path) or os.path.getsize(temp_audio_path) == 0:
+            raise Exception("音频文件未创建或为空")
+        print(f"音频文件大小: {os.path.getsize(temp_audio_path)} 字节")
+
+        # 2. 编码视频并封装音轨（以帧为单位显示进度）
         print("\n" + "=" * 50)
-        print("步骤 2/3: 写入视频文件")
+        print("步骤 2/2: 编码视频并封装音轨")
         print("=" * 50)
 
         # 计算总帧数
         total_frames = int(composite_clip.duration * fps)
         print(f"总帧数: {total_frames}")
 
-        # 直接使用FFmpeg方法，避免moviepy卡住问题
-        _write_video_with_ffmpeg_detailed(composite_clip, temp_video_path, fps, total_frames)
-        print(f"\n✓ 视频文件写入完成 ({total_frames} 帧)")
-
-        # 3. 合并音频和视频
-        print("\n" + "=" * 50)
-        print("步骤 3/3: 合并音频和视频")
-        print("=" * 50)
-
-        # Check if both files were created successfully
-        import os
-        if not os.path.exists(temp_video_path) or os.path.getsize(temp_video_path) == 0:
+        # 直接使用FFmpeg方法，避免moviepy卡住问题；一次编码直接得到最终文件，不再写临时视频再合并
+        # 幻灯片内容以静止/缓慢运动的画面为主：stillimage 调优，关闭 B 帧、固定 GOP 以加快编码；
+        _write_video_with_ffmpeg_detailed(composite_clip, save_path, fps, total_frames,
+                                          tune='stillimage', x264_params='keyint=60:bframes=0',
+                                          audio_path=temp_audio_path, audio_codec=audio_codec)
+        if not os.path.exists(save_path) or os.path.getsize(save_path) == 0:
             raise Exception("视频文件未创建或为空")
-        if not os.path.exists(temp_audio_path) or os.path.getsize(temp_audio_path) == 0:
-            raise Exception("音频文件未创建或为空")
-
-        print(f"视频文件大小: {os.path.getsize(temp_video_path)} 字节")
-        print(f"音频文件大小: {os.path.getsize(temp_audio_path)} 字节")
-
-        # 合并进度监控 - 基于文件存在性
-        def merge_progress_monitor():
-            """合并进度监控器 - 基于输出文件状态"""
-            start_time = time.time()
-            while not hasattr(merge_progress_monitor, 'stop'):
-                elapsed = time.time() - start_time
-
-                # 检查输出文件是否存在
-                if os.path.exists(save_path.__str__()):
-                    file_size = os.path.getsize(save_path.__str__())
-                    print(f"\r合并进度: 完成 - {elapsed:.1f}s (输出文件: {file_size / 1024 / 1024:.1f}MB)", end='',
-                          flush=True)
-                    break
-                else:
-                    # 基于时间估算，但更保守
-                    estimated_total = 60  # 增加到60秒
-                    percent = min(95, int((elapsed / estimated_total) * 100))  # 最多显示95%
-                    print(f"\r合并进度: {percent:.1f}% - {elapsed:.1f}s", end='', flush=True)
-
-                time.sleep(0.5)
-
-        print("开始合并音频和视频...")
-        merge_thread = threading.Thread(target=merge_progress_monitor)
-        merge_thread.daemon = True
-        merge_thread.start()
-
-        import subprocess
-        try:
-            # 方法1：使用copy编解码器（最快）
-            cmd = [
-                'ffmpeg',
-                '-i', temp_video_path,
-                '-i', temp_audio_path,
-                '-c:v', 'copy',
-                '-c:a', 'aac',
-                '-b:a', '128k',
-                '-shortest',  # 使用较短的流长度
-                save_path.__str__()
-            ]
-            print(f"FFmpeg命令: {' '.join(cmd)}")
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
-
-            merge_progress_monitor.stop = True
-            merge_thread.join(timeout=1)
-
-            print(f"\nFFmpeg返回码: {result.returncode}")
-            if result.stderr:
-                print(f"FFmpeg错误信息:\n{result.stderr}")
-
-            if result.returncode == 0:
-                print("✓ 音频视频合并成功!")
-            else:
-                raise Exception(f"FFmpeg失败，返回码 {result.returncode}")
-
-        except subprocess.TimeoutExpired:
-            print("\nFFmpeg超时，尝试备用方法...")
-            # 备用方法
-            cmd_alt = [
-                'ffmpeg', '-y',
-                '-i', temp_video_path,
-                '-i', temp_audio_path,
-                '-c:v', 'libx264',
-                '-c:a', 'aac',
-                '-b:a', '128k',
-                '-shortest',
-                save_path.__str__()
-            ]
-            result = subprocess.run(cmd_alt, capture_output=True, text=True, timeout=300)
-
-            merge_progress_monitor.stop = True
-            merge_thread.join(timeout=1)
-
-            print(f"\n备用FFmpeg返回码: {result.returncode}")
-            if result.stderr:
-                print(f"备用FFmpeg错误信息:\n{result.stderr}")
-
-        except Exception as e:
-            print(f"\nFFmpeg合并失败: {e}")
-            raise
+        print(f"\n✓ 视频文件写入完成 ({total_frames} 帧, {os.path.getsize(save_path) / 1024 / 1024:.1f}MB)")
 
         print("\n" + "=" * 50)
         print("✓ 视频合成完成!")
         print("=" * 50)
 
         # Cleanup temporary files
-        if os.path.exists(temp_video_path):
-            os.remove(temp_video_path)
         if os.path.exists(temp_audio_path):
             os.remove(temp_audio_path)
 
@@ -1516,7 +1685,6 @@ class SlideshowVideoComposeAgent:
         return existing
 
     def call(self, params):
-        import json
         height = params["height"]
         width = params["width"]
         pages = params["pages"]
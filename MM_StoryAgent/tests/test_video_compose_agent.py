@@ -0,0 +1,40 @@
+import pytest
+
+pytest.importorskip("librosa")
+pytest.importorskip("moviepy")
+pytest.importorskip("numpy")
+pytest.importorskip("PIL")
+
+from mm_story_agent.video_compose_agent import _format_srt_time, split_text_for_speech  # noqa: E402
+
+
+@pytest.mark.parametrize("seconds, expected", [
+    (0, "00:00:00,000"),
+    (1.5, "00:00:01,500"),
+    (3661.25, "01:01:01,250"),
+    (0.0004, "00:00:00,000"),
+    (0.0006, "00:00:00,001"),
+    (59.9996, "00:01:00,000"),
+    (3599.9999, "01:00:00,000"),
+])
+def test_format_srt_time_rounds_to_millisecond(seconds, expected):
+    assert _format_srt_time(seconds) == expected
+
+
+def test_split_keeps_abbreviation_inside_sentence():
+    text = "I met Dr. Smith at 5 p.m. yesterday. He was kind."
+    assert split_text_for_speech(text) == ["I met Dr. Smith at 5 p.m. yesterday.", "He was kind."]
+
+
+def test_split_prefers_longer_abbreviation():
+    assert split_text_for_speech("See Nos. 4 and 5. Then stop.") == ["See Nos. 4 and 5.", "Then stop."]
+
+
+def test_split_abbreviation_needs_word_boundary():
+    # "Taco." ends in "Co." but is not the abbreviation, so the sentence still ends there
+    assert split_text_for_speech("We ate a Taco. Then we left.") == ["We ate a Taco.", "Then we left."]
+
+
+def test_split_empty_text():
+    assert split_text_for_speech("") == []
+    assert split_text_for_speech("   ") == []
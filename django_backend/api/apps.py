@@ -4,3 +4,16 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "api"
+
+    def ready(self):
+        from django.conf import settings
+
+        # Serving processes (CHANNEL_LAYERS is empty for management commands) resolve the
+        # template context processors now instead of inside the first rendered response.
+        if settings.CHANNEL_LAYERS:
+            from django.template import engines
+
+            for backend in engines.all():
+                engine = getattr(backend, "engine", None)
+                if engine is not None:
+                    engine.template_context_processors  # cached_property: imports and caches them
@@ -0,0 +1,49 @@
+"""Post-processing for split speech segments.
+
+Kept free of Django/vendor imports and fully annotated so it can be compiled
+with mypyc (``mypyc api/services/_merge.py``) where a build step is available;
+the pure-Python module is used otherwise.
+"""
+from __future__ import annotations
+
+import re
+from typing import List
+
+_WS_RE = re.compile(r"\s")
+
+
+def word_count(s: str) -> int:
+    # Rough word count: split on whitespace; for CJK text without spaces, count as len(s)
+    if _WS_RE.search(s) is not None:
+        return len(s.split())
+    return max(1, len(s))
+
+
+def _join(prev: str, cur: str) -> str:
+    # Latin-ish (space-delimited) text: either side has a space and contains a lowercase letter
+    # (Unicode-aware, so Cyrillic/Greek count; CJK letters are uncased and join without a space)
+    if (" " in prev or " " in cur) and any(c.islower() for c in cur + prev):
+        return (prev.rstrip() + " " + cur.lstrip()).strip()
+    return prev + cur
+
+
+def merge_short_segments(segments: List[str], min_chars: int = 15, min_words: int = 3) -> List[str]:
+    """Merge segments shorter than ``min_chars``/``min_words`` into their predecessor."""
+    if not segments:
+        return segments
+    merged: List[str] = []
+    for seg in segments:
+        cur = seg.strip()
+        if not cur:
+            continue
+        too_short = (len(cur) < min_chars) or (word_count(cur) < min_words)
+        if too_short and merged:
+            merged[-1] = _join(merged[-1], cur)
+        else:
+            merged.append(cur)
+    # If first still short and there is more than one, merge forward
+    if len(merged) >= 2 and ((len(merged[0]) < min_chars) or (word_count(merged[0]) < min_words)):
+        first, second = merged[0], merged[1]
+        merged[1] = (first.rstrip() + (" " if (" " in first or " " in second) else "") + second.lstrip()).strip()
+        merged = merged[1:]
+    return merged
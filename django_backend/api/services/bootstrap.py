@@ -9,25 +9,11 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
 
-# Load environment variables from .env files if present (local lightweight loader)
-def _load_env_file(path: Path):
+# Load environment variables from .env files if present (shared loader with settings)
+from django_backend.envfile import load_env_file
+
+for _env in (PROJECT_ROOT / "configs/.env", PROJECT_ROOT / "config/.env"):
     try:
-        if not path.exists():
-            return
-        for line in path.read_text(encoding="utf-8").splitlines():
-            line = line.strip()
-            if not line or line.startswith('#') or '=' not in line:
-                continue
-            k, v = line.split('=', 1)
-            k = k.strip()
-            v = v.strip().strip('"').strip("'")
-            if k and k not in os.environ:
-                os.environ[k] = v
+        load_env_file(_env)
     except Exception:
         pass
-
-
-import os
-
-_load_env_file(PROJECT_ROOT / "configs/.env")
-_load_env_file(PROJECT_ROOT / "config/.env")
@@ -2,18 +2,80 @@ from __future__ import annotations
 
 import json
 import logging
+import os
+import re
+import threading
 from pathlib import Path
 from typing import Dict, List
 
 # Ensure project root on path and load env
 from .bootstrap import *  # noqa: F401
+from ._merge import merge_short_segments
 from .vendor.base import init_tool_instance
-from .vendor.model_config import get_model_config_instance, load_model_for_agent
+from .vendor.model_config import (
+    freeze_agent_config,
+    get_model_config_instance,
+    load_model_for_agent_cached,
+)
+
+try:  # optional: faster (de)serialization of script_data.json
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
 ALLOWED_BGM_EXTENSIONS = {".mp3", ".wav", ".flac"}
 
+_NUM_RE = re.compile(r"\d+")
+
+# Resolved BGM paths keyed by (raw, base_dir). Only hits are stored so a file added after a
+# miss is picked up on the next run; a cached hit is re-checked in case it was removed.
+_BGM_CACHE: Dict[tuple, str] = {}
+
+
+def _resolve_bgm(raw: str, base_dir: str) -> str | None:
+    cached = _BGM_CACHE.get((raw, base_dir))
+    if cached is not None and os.path.isfile(cached):
+        return cached
+    candidate = Path(raw)
+    if not candidate.is_absolute():
+        candidate = Path(base_dir) / candidate
+    candidate = candidate.resolve()
+    if not candidate.is_file():
+        logger.warning("Configured BGM file not found, skipping: %s", raw)
+        return None
+    suffix = candidate.suffix.lower()
+    if suffix not in ALLOWED_BGM_EXTENSIONS:
+        logger.warning(
+            "Configured BGM file has unsupported extension '%s'. Allowed: %s",
+            suffix,
+            sorted(ALLOWED_BGM_EXTENSIONS),
+        )
+        return None
+    resolved = str(candidate)
+    _BGM_CACHE[(raw, base_dir)] = resolved
+    return resolved
+
+
+def _numeric_name_key(path: str) -> tuple:
+    # p2.png < p10.png and s1_2.wav < s1_10.wav < s2_1.wav (names are not zero-padded)
+    name = os.path.basename(path)
+    return tuple(int(n) for n in _NUM_RE.findall(name)), name
+
+
+def _list_outputs(directory: Path, prefix: str, suffix: str) -> List[str]:
+    # Single scandir pass; avoids building a Path object per entry like glob() does
+    try:
+        with os.scandir(directory) as it:
+            return sorted(
+                (e.path for e in it
+                 if e.name.startswith(prefix) and e.name.endswith(suffix) and e.is_file(follow_symlinks=False)),
+                key=_numeric_name_key,
+            )
+    except FileNotFoundError:
+        return []
+
 
 class WorkflowRunner:
     def __init__(self, project_root: Path | None = None,
@@ -36,8 +98,17 @@ class WorkflowRunner:
         import yaml
         with open(self.base_config_path, "r", encoding="utf-8") as f:
             self.base_cfg: Dict = yaml.load(f, Loader=yaml.FullLoader)
+        # Frozen (JSON) form of each agent section, used as key for the merged model config cache
+        self._frozen_cfg: Dict[str, str] = {
+            k: freeze_agent_config(v) for k, v in self.base_cfg.items() if isinstance(v, dict)
+        }
+
+    def _merged_cfg(self, section: str, model_type: str) -> Dict:
+        return load_model_for_agent_cached(self._frozen_cfg[section], model_type)
 
     def _story_dir(self, story_dir: str | Path) -> Path:
+        # Not memoized: the runner is process-wide and a redo (api._prepare_redo) may remove
+        # these directories between calls
         p = Path(story_dir)
         p.mkdir(parents=True, exist_ok=True)
         (p / "image").mkdir(exist_ok=True)
@@ -45,21 +116,30 @@ class WorkflowRunner:
         return p
 
     def _save_script(self, story_dir: Path, script_data: Dict):
-        with open(story_dir / "script_data.json", "w", encoding="utf-8") as w:
-            json.dump(script_data, w, ensure_ascii=False, indent=4)
+        p = story_dir / "script_data.json"
+        if orjson is not None:
+            p.write_bytes(orjson.dumps(script_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            with open(p, "w", encoding="utf-8") as w:
+                json.dump(script_data, w, ensure_ascii=False, indent=4)
 
     def _load_script(self, story_dir: Path) -> Dict:
+        # Parsed fresh on every call: callers mutate the result, and re-parsing is cheaper than
+        # deep-copying a cached object
         p = story_dir / "script_data.json"
-        if p.exists():
+        try:
+            if orjson is not None:
+                return orjson.loads(p.read_bytes())
             with open(p, "r", encoding="utf-8") as r:
                 return json.load(r)
-        return {"pages": []}
+        except FileNotFoundError:
+            return {"pages": []}
 
     # ========== Segment 1: Story ==========
     def run_story(self, story_dir: str | Path, topic: str, main_role: str = "", scene: str = "", description: str = "") -> List[str]:
         story_dir = self._story_dir(story_dir)
         cfg = dict(self.base_cfg["story_writer"])  # shallow copy
-        merged_cfg = load_model_for_agent(cfg, 'llm')
+        merged_cfg = self._merged_cfg("story_writer", 'llm')
         writer = init_tool_instance({"tool": cfg["tool"], "cfg": merged_cfg})
 
         # Build story setting string, prioritize user input over config defaults
@@ -93,7 +173,7 @@ class WorkflowRunner:
         if pages is None:
             pages = [p.get("story", "") for p in script.get("pages", [])]
         agent_config = dict(self.base_cfg["image_generation"])  # copy
-        merged_cfg = load_model_for_agent(agent_config, 'image')
+        merged_cfg = self._merged_cfg("image_generation", 'image')
         # Attach LLM model info if required by image agent
         if 'llm_model' in agent_config:
             llm_config = self.model_config.get_llm_config(agent_config['llm_model'])
@@ -106,11 +186,16 @@ class WorkflowRunner:
         result = agent.call(params)
         # write prompts back
         if isinstance(result, dict) and "prompts" in result:
+            script_pages = script.get("pages", [])
+            changed = False
             for idx, prompt in enumerate(result["prompts"]):
-                if idx < len(script.get("pages", [])):
-                    script["pages"][idx]["image_prompt"] = prompt
-            self._save_script(Path(story_dir), script)
-        images = sorted([str(p) for p in (Path(story_dir) / "image").glob("p*.png")])
+                if idx < len(script_pages) and script_pages[idx].get("image_prompt") != prompt:
+                    script_pages[idx]["image_prompt"] = prompt
+                    changed = True
+            # Retried segments usually reproduce the same prompts; skip the rewrite then
+            if changed:
+                self._save_script(Path(story_dir), script)
+        images = _list_outputs(Path(story_dir) / "image", "p", ".png")
         return images
 
     # ========== Segment 3: Split ==========
@@ -129,7 +214,6 @@ class WorkflowRunner:
         script = self._load_script(Path(story_dir))
         if pages is None:
             pages = [p.get("story", "") for p in script.get("pages", [])]
-        segmented = [split_text_for_speech(page, max_chars=max_chars) for page in pages]
 
         # thresholds from config (with sensible defaults)
         ts_params = self.base_cfg.get("text_split", {}).get("params", {})
@@ -137,39 +221,11 @@ class WorkflowRunner:
         min_words_short = int(ts_params.get("min_words_per_segment", 3))
 
         # Post-process: merge too-short segments to avoid 1-2 word chunks
-        def _word_count(s: str) -> int:
-            # Rough word count: split on whitespace; for CJK text without spaces, count as len(s)
-            if any(ch.isspace() for ch in s):
-                return len([w for w in s.strip().split() if w])
-            return max(1, len(s))
-
-        def _merge_short_segments(segments: List[str], min_chars: int = 15, min_words: int = 3) -> List[str]:
-            if not segments:
-                return segments
-            merged: List[str] = []
-            for seg in segments:
-                cur = seg.strip()
-                if not cur:
-                    continue
-                too_short = (len(cur) < min_chars) or (_word_count(cur) < min_words)
-                if too_short and merged:
-                    # Try merge with previous
-                    prev = merged.pop()
-                    # If both are latin-ish with spaces, join with space; else direct concat
-                    if any(c.isalpha() and c.lower() == c for c in (cur + prev)) and (" " in prev or " " in cur):
-                        new = (prev.rstrip() + " " + cur.lstrip()).strip()
-                    else:
-                        new = (prev + cur)
-                    merged.append(new)
-                else:
-                    merged.append(cur)
-            # If first still short and there is more than one, merge forward
-            if len(merged) >= 2 and ((len(merged[0]) < min_chars) or (_word_count(merged[0]) < min_words)):
-                merged[1] = (merged[0].rstrip() + (" " if (" " in merged[0] or " " in merged[1]) else "") + merged[1].lstrip()).strip()
-                merged = merged[1:]
-            return merged
-
-        segmented = [_merge_short_segments(segs) for segs in segmented]
+        segmented = [
+            merge_short_segments(split_text_for_speech(page, max_chars=max_chars),
+                                 min_chars=min_chars_short, min_words=min_words_short)
+            for page in pages
+        ]
 
         script["segmented_pages"] = segmented
         self._save_script(Path(story_dir), script)
@@ -185,7 +241,7 @@ class WorkflowRunner:
         if pages is None:
             pages = [p.get("story", "") for p in script.get("pages", [])]
         agent_config = dict(self.base_cfg["speech_generation"])  # copy
-        merged_cfg = load_model_for_agent(agent_config, 'speech')
+        merged_cfg = self._merged_cfg("speech_generation", 'speech')
         agent = init_tool_instance({"tool": agent_config["tool"], "cfg": merged_cfg})
         params = agent_config.get("params", {}).copy()
         params.update({
@@ -194,7 +250,7 @@ class WorkflowRunner:
             "segmented_pages": segmented_pages,
         })
         agent.call(params)
-        wavs = sorted([str(p) for p in (Path(story_dir) / "speech").glob("s*.wav")])
+        wavs = _list_outputs(Path(story_dir) / "speech", "s", ".wav")
         return wavs
 
     # ========== Segment 5: Video (slideshow compose) ==========
@@ -216,25 +272,9 @@ class WorkflowRunner:
         if raw_bgm:
             from django.conf import settings as dj_settings
 
-            candidate = Path(raw_bgm)
-            if not candidate.is_absolute():
-                candidate = (Path(dj_settings.BASE_DIR) / candidate).resolve()
-            else:
-                candidate = candidate.resolve()
-            if candidate.is_file():
-                suffix = candidate.suffix.lower()
-                if suffix in ALLOWED_BGM_EXTENSIONS:
-                    resolved_bgm = candidate
-                else:
-                    logger.warning(
-                        "Configured BGM file has unsupported extension '%s'. Allowed: %s",
-                        suffix,
-                        sorted(ALLOWED_BGM_EXTENSIONS),
-                    )
-            else:
-                logger.warning("Configured BGM file not found, skipping: %s", raw_bgm)
+            resolved_bgm = _resolve_bgm(str(raw_bgm), str(dj_settings.BASE_DIR))
         if resolved_bgm:
-            params["bgm_path"] = str(resolved_bgm)
+            params["bgm_path"] = resolved_bgm
         else:
             params.pop("bgm_path", None)
 
@@ -254,7 +294,7 @@ class WorkflowRunner:
         if not t2v_cfg:
             raise RuntimeError("t2v_generation config missing in mm_story_agent.yaml")
         # Merge model config
-        merged_cfg = load_model_for_agent(t2v_cfg, 'video')
+        merged_cfg = self._merged_cfg("t2v_generation", 'video')
         agent = init_tool_instance({"tool": t2v_cfg["tool"], "cfg": merged_cfg})
         params = dict(t2v_cfg.get("params") or {})
         params["story_dir"] = str(Path(story_dir))
@@ -262,3 +302,17 @@ class WorkflowRunner:
         if overrides:
             params.update(overrides)
         return agent.call(params)
+
+
+_runner: WorkflowRunner | None = None
+_runner_lock = threading.Lock()
+
+
+def get_runner() -> WorkflowRunner:
+    """Process-wide WorkflowRunner, so config parsing and per-runner caches survive across tasks."""
+    global _runner
+    if _runner is None:
+        with _runner_lock:
+            if _runner is None:
+                _runner = WorkflowRunner()
+    return _runner
@@ -1,17 +1,35 @@
 from __future__ import annotations
 
+import functools
 import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List
 
 import redis
 from celery import shared_task
+from celery.signals import worker_process_init
 from django.conf import settings
-from django.db import transaction
+from django.db import connection, transaction
 from django.utils import timezone
 
 from .models import Task, TaskSegment, Resource
 
+logger = logging.getLogger(__name__)
+
+try:  # optional: faster serialization, publish() accepts bytes directly
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dumps(payload: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
 
 def _relativize_path(p: str | Path) -> str:
     from pathlib import Path as _P
@@ -30,21 +48,68 @@ def _relativize_path(p: str | Path) -> str:
 
 
 def _record_resources(task: Task, segment_id: int, paths: List[str], rtype: str):
-    for p in paths:
-        rel = _relativize_path(p)
-        Resource.objects.create(task=task, segment_id=segment_id, type=rtype, path=rel)
+    # Single multi-row INSERT instead of one round-trip per file
+    Resource.objects.bulk_create([
+        Resource(task=task, segment_id=segment_id, type=rtype, path=_relativize_path(p))
+        for p in paths
+    ])
+
+
+def _locked_segment_qs(task_id: int, segment_id: int):
+    # One JOIN query for segment + task instead of two separate locked fetches.
+    # Backends without FOR UPDATE OF (SQLite ignores row locks entirely) lock without of=.
+    qs = TaskSegment.objects.select_related("task").filter(task_id=task_id, segment_id=segment_id)
+    if connection.features.has_select_for_update_of:
+        return qs.select_for_update(of=("self", "task"))
+    return qs.select_for_update()
+
+
+# Publishing happens off the task thread so the worker does not wait on the Redis round-trip
+_NOTIFY_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="notify")
+
+
+@functools.lru_cache(maxsize=1)
+def _redis_client():
+    # One client (and connection pool) per worker process instead of one per publish
+    return redis.from_url(getattr(settings, "REDIS_URL", "redis://localhost:6379/0"))
 
 
 def _publish_notify(user_id: int, payload: dict):
     try:
-        r = redis.from_url(getattr(settings, "REDIS_URL", "redis://localhost:6379/0"))
         channel = f"user:{user_id}"
-        r.publish(channel, json.dumps(payload, ensure_ascii=False))
+        _redis_client().publish(channel, _dumps(payload))
     except Exception:
         # Swallow notification errors to not fail task
         pass
 
 
+def _notify_async(user_id: int, payload: dict):
+    try:
+        _NOTIFY_POOL.submit(_publish_notify, user_id, payload)
+    except RuntimeError:
+        # Pool already shut down (interpreter exiting): publish inline
+        _publish_notify(user_id, payload)
+
+
+def _notify_on_commit(user_id: int, payload: dict):
+    # Only tell clients about state that is actually committed
+    transaction.on_commit(functools.partial(_notify_async, user_id, payload))
+
+
+@worker_process_init.connect
+def _warm_workflow(**kwargs):
+    # Pay heavy imports (vendor agents, cv2) and config parsing in the fresh worker
+    # process rather than inside its first task. Set WORKFLOW_EAGER_WARM=0 to skip.
+    if os.environ.get("WORKFLOW_EAGER_WARM", "1") != "1":
+        return
+    try:
+        from .services.workflow import get_runner
+        from .services.vendor import base, video_compose_agent  # noqa: F401
+        get_runner()
+    except Exception:
+        logger.warning("Workflow warm-up failed; deferring to first task", exc_info=True)
+
+
 @shared_task(bind=True, autoretry_for=(), retry_backoff=False)
 def execute_task_segment(self, task_id: int, segment_id: int):
     # Make the task robust and idempotent-ish
@@ -73,8 +138,8 @@ def execute_task_segment(self, task_id: int, segment_id: int):
                 task.save(update_fields=["status"])
 
         # Execute outside of the open transaction (lazy import heavy deps here)
-        from .services.workflow import WorkflowRunner
-        runner = WorkflowRunner()
+        from .services.workflow import get_runner
+        runner = get_runner()
         story_dir = Path(task.story_dir or task.ensure_story_dir())
 
         created_resources: List[str] = []
@@ -124,8 +189,8 @@ def execute_task_segment(self, task_id: int, segment_id: int):
 
         with transaction.atomic():
             # Reload current objects under lock and persist results
-            task = Task.objects.select_for_update().get(id=task_id)
-            seg = TaskSegment.objects.select_for_update().get(task=task, segment_id=segment_id)
+            seg = _locked_segment_qs(task_id, segment_id).get()
+            task = seg.task
             if created_resources and rtype:
                 _record_resources(task, segment_id, created_resources, rtype)
             seg.status = "completed"
@@ -139,29 +204,32 @@ def execute_task_segment(self, task_id: int, segment_id: int):
                 task.story_dir = str(story_dir)
             task.save(update_fields=["current_segment", "status", "story_dir"])
 
-        # Notify success (send relative paths)
-        rel_resources = [
-            _relativize_path(p) for p in (created_resources or [])
-        ]
-        _publish_notify(
-            user_id=task.user_id,
-            payload={
-                "type": "segment_finished",
-                "task_id": task.id,
-                "segment_id": segment_id,
-                "status": "completed",
-                "workflow_version": (task.workflow_version or "default").lower(),
-                "resources": rel_resources,
-            },
-        )
+            # Notify success (send relative paths)
+            rel_resources = [
+                _relativize_path(p) for p in (created_resources or [])
+            ]
+            _notify_on_commit(
+                user_id=task.user_id,
+                payload={
+                    "type": "segment_finished",
+                    "task_id": task.id,
+                    "segment_id": segment_id,
+                    "status": "completed",
+                    "workflow_version": (task.workflow_version or "default").lower(),
+                    "resources": rel_resources,
+                },
+            )
 
     except Exception as e:
         # Persist failure state and notify
         with transaction.atomic():
-            task = Task.objects.select_for_update().filter(id=task_id).first()
-            if not task:
-                return
-            seg = TaskSegment.objects.select_for_update().filter(task=task, segment_id=segment_id).first()
+            seg = _locked_segment_qs(task_id, segment_id).first()
+            if seg:
+                task = seg.task
+            else:
+                task = Task.objects.select_for_update().filter(id=task_id).first()
+                if not task:
+                    return
             if seg:
                 seg.status = "failed"
                 seg.error_message = str(e)
@@ -169,8 +237,7 @@ def execute_task_segment(self, task_id: int, segment_id: int):
                 seg.save(update_fields=["status", "error_message", "ended_at"])
             task.status = "failed"
             task.save(update_fields=["status"])
-        try:
-            _publish_notify(
+            _notify_on_commit(
                 user_id=task.user_id,
                 payload={
                     "type": "segment_failed",
@@ -180,5 +247,3 @@ def execute_task_segment(self, task_id: int, segment_id: int):
                     "error": str(e),
                 },
             )
-        except Exception:
-            pass
@@ -0,0 +1,78 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from api.services._merge import _join, merge_short_segments, word_count
+
+try:  # needs the full backend environment (Django, Celery, vendor agents)
+    from api.services.workflow import WorkflowRunner
+except ImportError:
+    WorkflowRunner = None
+
+
+class MergeShortSegmentsTests(unittest.TestCase):
+    def test_word_count_spaced_and_unspaced(self):
+        self.assertEqual(word_count("one two three"), 3)
+        self.assertEqual(word_count("你好世界"), 4)
+        self.assertEqual(word_count(""), 1)
+
+    def test_join_latin_with_space(self):
+        self.assertEqual(_join("Hello world.", "Next one"), "Hello world. Next one")
+
+    def test_join_cyrillic_with_space(self):
+        self.assertEqual(_join("Привет, как дела сегодня", "да"), "Привет, как дела сегодня да")
+
+    def test_join_greek_with_space(self):
+        self.assertEqual(_join("καλημέρα κόσμε", "ναι"), "καλημέρα κόσμε ναι")
+
+    def test_join_uppercase_boundary_with_space(self):
+        self.assertEqual(_join("We went to the USA.", "OK then."), "We went to the USA. OK then.")
+        self.assertEqual(_join("He said NO", "I."), "He said NO I.")
+
+    def test_join_cjk_without_space(self):
+        self.assertEqual(_join("你好 世界", "朋友"), "你好 世界朋友")
+        self.assertEqual(_join("你好世界", "朋友"), "你好世界朋友")
+
+    def test_short_segment_merges_into_predecessor(self):
+        segments = ["This sentence is long enough to stand.", "Yes."]
+        self.assertEqual(merge_short_segments(segments), ["This sentence is long enough to stand. Yes."])
+
+    def test_short_first_segment_merges_forward(self):
+        segments = ["Oh.", "This sentence is long enough to stand."]
+        self.assertEqual(merge_short_segments(segments), ["Oh. This sentence is long enough to stand."])
+
+    def test_blank_segments_dropped_and_thresholds_respected(self):
+        segments = ["  ", "Short one here.", "Another short one."]
+        self.assertEqual(merge_short_segments(segments, min_chars=5, min_words=2),
+                         ["Short one here.", "Another short one."])
+        self.assertEqual(merge_short_segments([]), [])
+
+
+@unittest.skipIf(WorkflowRunner is None, "workflow dependencies not installed")
+class StoryDirRedoTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        # Only _story_dir is exercised; skip config loading in __init__
+        self.runner = WorkflowRunner.__new__(WorkflowRunner)
+
+    def test_redo_twice_through_same_runner(self):
+        story = self.tmp / "story"
+        for _ in range(2):
+            d = self.runner._story_dir(story)
+            (d / "image" / "p1.png").write_bytes(b"")
+            (d / "speech" / "s1_1.wav").write_bytes(b"")
+            # What api._prepare_redo does for segment 2
+            shutil.rmtree(d / "image")
+            shutil.rmtree(d / "speech")
+        d = self.runner._story_dir(story)
+        self.assertTrue((d / "image").is_dir())
+        self.assertTrue((d / "speech").is_dir())
+
+    def test_redo_after_full_wipe(self):
+        story = self.tmp / "story"
+        self.runner._story_dir(story)
+        shutil.rmtree(story)
+        d = self.runner._story_dir(story)
+        self.assertTrue((d / "image").is_dir())
@@ -0,0 +1,67 @@
+"""Tiny .env loader shared by settings and the services bootstrap."""
+import io
+import os
+import re
+import stat
+from pathlib import Path
+
+try:  # python-dotenv ships with uvicorn[standard]; fall back to a regex parser without it
+    from dotenv import dotenv_values
+except ImportError:
+    dotenv_values = None
+
+# KEY=VALUE per line: value is "double", 'single' or bare (" #" starts an inline comment);
+# comment lines and lines without "=" never match
+_ENV_RE = re.compile(
+    r"^[^\S\n]*([A-Za-z_][A-Za-z0-9_]*)[^\S\n]*=[^\S\n]*"
+    r"(?:\"([^\"\n]*)\"|'([^'\n]*)'|([^\n]*?))"
+    r"(?:[^\S\n]+#[^\n]*)?[^\S\n]*$",
+    re.MULTILINE,
+)
+
+# str(path) -> (st_mtime_ns, st_size, parsed); re-parsed only when the file changes
+_ENV_CACHE: dict[str, tuple[int, int, dict]] = {}
+
+
+def parse_env_file(path) -> dict:
+    """Return the KEY -> value pairs of a .env file (empty dict if it does not exist)."""
+    path = Path(path)
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return {}
+    if not stat.S_ISREG(st.st_mode):
+        return {}
+    key = str(path)
+    cached = _ENV_CACHE.get(key)
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+    # One read + one decode; no TextIOWrapper / incremental decoder for a few-line file
+    try:
+        data = path.read_bytes().decode("utf-8", errors="ignore")
+    except FileNotFoundError:
+        return {}
+    if dotenv_values is not None:
+        parsed = {k: v or "" for k, v in dotenv_values(stream=io.StringIO(data), interpolate=False).items()}
+    else:
+        parsed = {k: dq or sq or bare for k, dq, sq, bare in _ENV_RE.findall(data)}
+    _ENV_CACHE[key] = (st.st_mtime_ns, st.st_size, parsed)
+    return parsed
+
+
+def load_env_file(path):
+    """Export variables from ``path`` without overriding ones already in the environment.
+
+    Skipped entirely with ``DOTENV_SKIP=1`` (env injected by Docker/systemd). Files already
+    applied are recorded in ``DJANGO_ENV_LOADED`` so child processes inheriting the
+    environment (Celery workers, autoreload) do not read them again.
+    """
+    if os.environ.get("DOTENV_SKIP") == "1":
+        return
+    key = str(Path(path).resolve())
+    loaded = os.environ.get("DJANGO_ENV_LOADED", "")
+    if key in loaded.split(os.pathsep):
+        return
+    for name, value in parse_env_file(path).items():
+        os.environ.setdefault(name, value)
+    os.environ["DJANGO_ENV_LOADED"] = f"{loaded}{os.pathsep}{key}" if loaded else key
@@ -1,9 +1,19 @@
+import atexit
+import logging
 import os
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
-BASE_DIR = Path(__file__).resolve().parent.parent
+from .envfile import load_env_file
 
-SECRET_KEY = os.environ.get("DJANGO_SECRET_KEY", "dev-secret-key-change-me")
+# String ops only: __file__ is already absolute, no per-component lstat as with resolve()
+BASE_DIR = Path(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_env = os.environ.get
+
+SECRET_KEY = _env("DJANGO_SECRET_KEY", "dev-secret-key-change-me")
 DEBUG = False
 ALLOWED_HOSTS = ["*"]
 
@@ -19,6 +29,27 @@ INSTALLED_APPS = [
     "api",
 ]
 
+# Management commands that never serve requests skip the heavy channels/redis import chain.
+# channels has no models, so it can go for any of these; django_celery_results does, so it is
+# only dropped where the database is not touched. DJANGO_ENABLE_CHANNELS=1 keeps everything.
+_CMD = sys.argv[1] if len(sys.argv) > 1 and os.path.basename(sys.argv[0]) == "manage.py" else ""
+_ALL_APPS = _env("DJANGO_ENABLE_CHANNELS") == "1"
+_NEEDS_CHANNELS = _CMD not in {
+    "makemigrations", "migrate", "showmigrations", "help", "shell", "collectstatic", "check", "createsuperuser",
+} or _ALL_APPS
+_NEEDS_CELERY_RESULTS = _CMD not in {"help", "collectstatic"} or _ALL_APPS
+if not _NEEDS_CHANNELS:
+    INSTALLED_APPS.remove("channels")
+if not _NEEDS_CELERY_RESULTS:
+    INSTALLED_APPS.remove("django_celery_results")
+
+# The service is a headless REST/WebSocket API; the admin site and the apps it needs
+# (messages, staticfiles) are only installed with ENABLE_ADMIN=1
+ENABLE_ADMIN = _env("ENABLE_ADMIN") == "1"
+if not ENABLE_ADMIN:
+    for _app in ("django.contrib.admin", "django.contrib.messages", "django.contrib.staticfiles"):
+        INSTALLED_APPS.remove(_app)
+
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -28,6 +59,8 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
+if not ENABLE_ADMIN:
+    MIDDLEWARE.remove("django.contrib.messages.middleware.MessageMiddleware")
 
 ROOT_URLCONF = "django_backend.urls"
 
@@ -37,12 +70,13 @@ TEMPLATES = [
         "DIRS": [],
         "APP_DIRS": True,
         "OPTIONS": {
-            "context_processors": [
+            "context_processors": (
                 "django.template.context_processors.debug",
                 "django.template.context_processors.request",
+            ) + ((
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
-            ],
+            ) if ENABLE_ADMIN else ()),
         },
     },
 ]
@@ -54,10 +88,22 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # WAL lets the web process read while Celery workers write; applied on each new connection
+        "OPTIONS": {
+            "timeout": 30,
+            "init_command": (
+                "PRAGMA journal_mode=WAL;"
+                "PRAGMA synchronous=NORMAL;"
+                "PRAGMA temp_store=MEMORY;"
+                "PRAGMA mmap_size=268435456;"
+                "PRAGMA cache_size=-65536;"
+            ),
+        },
+        "CONN_MAX_AGE": 60,
     }
 }
 
-AUTH_PASSWORD_VALIDATORS = []
+AUTH_PASSWORD_VALIDATORS = ()
 
 LANGUAGE_CODE = "zh-hans"
 TIME_ZONE = "UTC"
@@ -68,33 +114,33 @@ STATIC_URL = "/static/"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # Celery / Redis configuration
-CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL", "redis://localhost:6379/0")
-CELERY_RESULT_BACKEND = os.environ.get("CELERY_RESULT_BACKEND", "redis://localhost:6379/1")
-REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+CELERY_BROKER_URL = _env("CELERY_BROKER_URL", "redis://localhost:6379/0")
+CELERY_RESULT_BACKEND = _env("CELERY_RESULT_BACKEND", "redis://localhost:6379/1")
+REDIS_URL = _env("REDIS_URL", "redis://localhost:6379/0")
 
-CELERY_ACCEPT_CONTENT = ["json"]
+CELERY_ACCEPT_CONTENT = frozenset({"json"})
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = TIME_ZONE
 
 # Celery stability and reliability settings
-CELERY_BROKER_HEARTBEAT = int(os.environ.get("CELERY_BROKER_HEARTBEAT", 30))
-CELERY_BROKER_CONNECTION_TIMEOUT = int(os.environ.get("CELERY_BROKER_CONNECTION_TIMEOUT", 30))
-CELERY_BROKER_POOL_LIMIT = int(os.environ.get("CELERY_BROKER_POOL_LIMIT", 20))
+CELERY_BROKER_HEARTBEAT = int(_env("CELERY_BROKER_HEARTBEAT", 30))
+CELERY_BROKER_CONNECTION_TIMEOUT = int(_env("CELERY_BROKER_CONNECTION_TIMEOUT", 30))
+CELERY_BROKER_POOL_LIMIT = int(_env("CELERY_BROKER_POOL_LIMIT", 20))
 # Retry behavior
-CELERY_BROKER_CONNECTION_MAX_RETRIES = int(os.environ.get("CELERY_BROKER_CONNECTION_MAX_RETRIES", 0))  # 0=infinite
+CELERY_BROKER_CONNECTION_MAX_RETRIES = int(_env("CELERY_BROKER_CONNECTION_MAX_RETRIES", 0))  # 0=infinite
 CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
 
 # Ensure tasks are only acknowledged after successful execution
 CELERY_TASK_ACKS_LATE = True
 # Avoid over-prefetching on long CPU-bound tasks
-CELERY_WORKER_PREFETCH_MULTIPLIER = int(os.environ.get("CELERY_WORKER_PREFETCH_MULTIPLIER", 1))
+CELERY_WORKER_PREFETCH_MULTIPLIER = int(_env("CELERY_WORKER_PREFETCH_MULTIPLIER", 1))
 # If a worker is lost mid-task, requeue it (requires acks_late)
 CELERY_TASK_REJECT_ON_WORKER_LOST = True
 
 # Task time limits (seconds)
-CELERY_TASK_SOFT_TIME_LIMIT = int(os.environ.get("CELERY_TASK_SOFT_TIME_LIMIT", 1800))  # 30 min
-CELERY_TASK_TIME_LIMIT = int(os.environ.get("CELERY_TASK_TIME_LIMIT", 2100))  # 35 min
+CELERY_TASK_SOFT_TIME_LIMIT = int(_env("CELERY_TASK_SOFT_TIME_LIMIT", 1800))  # 30 min
+CELERY_TASK_TIME_LIMIT = int(_env("CELERY_TASK_TIME_LIMIT", 2100))  # 35 min
 
 # Transport options for Redis
 CELERY_BROKER_TRANSPORT_OPTIONS = {
@@ -117,23 +163,28 @@ CELERY_WORKER_CANCEL_LONG_RUNNING_TASKS_ON_CONNECTION_LOSS = True
 CELERY_RESULT_EXTENDED = True
 
 # Channels (WebSocket gateway)
-CHANNEL_LAYERS = {
-    "default": {
-        "BACKEND": "channels_redis.core.RedisChannelLayer",
-        "CONFIG": {
-            "hosts": [os.environ.get("REDIS_URL", REDIS_URL)],
-        },
+if _NEEDS_CHANNELS:
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels_redis.core.RedisChannelLayer",
+            "CONFIG": {
+                "hosts": [REDIS_URL],
+            },
+        }
     }
-}
+else:
+    CHANNEL_LAYERS = {}
 
 # Storage roots for generated assets (reuse project root generated_stories directory)
 # Store generated assets within django_backend directory by default
-GENERATED_ROOT = (BASE_DIR / "generated_stories").resolve()
-GENERATED_ROOT.mkdir(parents=True, exist_ok=True)
+GENERATED_ROOT = BASE_DIR / "generated_stories"
+# stat-only on warm starts; the directory normally exists after the first run
+if not GENERATED_ROOT.is_dir():
+    GENERATED_ROOT.mkdir(parents=True, exist_ok=True)
 
 # Token lifetimes (seconds)
-ACCESS_TOKEN_LIFETIME = int(os.environ.get("ACCESS_TOKEN_LIFETIME", 60 * 60))  # 1 hour
-REFRESH_TOKEN_LIFETIME = int(os.environ.get("REFRESH_TOKEN_LIFETIME", 7 * 24 * 3600))  # 7 days
+ACCESS_TOKEN_LIFETIME = int(_env("ACCESS_TOKEN_LIFETIME", 60 * 60))  # 1 hour
+REFRESH_TOKEN_LIFETIME = int(_env("REFRESH_TOKEN_LIFETIME", 7 * 24 * 3600))  # 7 days
 REFRESH_COOKIE_NAME = "refresh_token"
 REFRESH_COOKIE_SECURE = False
 REFRESH_COOKIE_HTTPONLY = True
@@ -141,31 +192,17 @@ REFRESH_COOKIE_HTTPONLY = True
 
 # --- Load .env for model/API keys on server startup ---
 # Prefer standard path "configs/.env"; also try "config/.env" for user convenience
-# Avoid external dependencies to keep settings self-contained
-
-def _load_env_file(path):
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            for raw in f:
-                line = raw.strip()
-                if not line or line.startswith("#"):
-                    continue
-                if "=" not in line:
-                    continue
-                key, value = line.split("=", 1)
-                key = key.strip()
-                value = value.strip().strip('"').strip("'")
-                os.environ.setdefault(key, value)
-    except FileNotFoundError:
-        pass
-
-
-_load_env_file(BASE_DIR / "config/.env")
+# Re-executing this module in the same process (importlib.reload) keeps the old globals,
+# so the flag turns the second run into a no-op; other processes rely on DJANGO_ENV_LOADED.
+_ENV_LOADED = getattr(sys.modules.get(__name__), "_ENV_LOADED", False)
+if not _ENV_LOADED:
+    load_env_file(BASE_DIR / "config/.env")
+    _ENV_LOADED = True
 
 # --- Proxy mapping: mirror ALL_PROXY to common envs if not explicitly set ---
 # Many libraries (requests, huggingface_hub, aiohttp) read HTTP(S)_PROXY variables.
 # If user only sets ALL_PROXY, propagate it to those variables to maximize compatibility.
-_all_proxy = os.environ.get("ALL_PROXY") or os.environ.get("all_proxy")
+_all_proxy = _env("ALL_PROXY") or _env("all_proxy")
 if _all_proxy:
     os.environ.setdefault("HTTP_PROXY", _all_proxy)
     os.environ.setdefault("HTTPS_PROXY", _all_proxy)
@@ -174,32 +211,72 @@ if _all_proxy:
     # Respect NO_PROXY / no_proxy if provided by user; do not set defaults here.
 
 
+# Log records are queued on the calling thread and written to stderr by a background listener.
+# QueueHandler.prepare() still merges msg % args (and exception text) on the calling thread; the
+# full line format and the stream write happen on the listener.
+# The queue and listener are recreated per process so forked Celery/uvicorn workers keep draining.
+_LOG_LEVEL = _env("DJANGO_LOG_LEVEL", "DEBUG" if DEBUG else "INFO").upper()
+_LOG_FORMAT = "[%(asctime)s] %(levelname)s %(name)s %(pathname)s:%(lineno)d %(funcName)s: %(message)s"
+_log_queue = queue.Queue(-1)
+_log_listener = None
+_queue_handlers = []
+
+
+def _make_queue_handler():
+    # Factory for dictConfig so the handlers can be pointed at a fresh queue after fork
+    handler = QueueHandler(_log_queue)
+    _queue_handlers.append(handler)
+    return handler
+
+
+def _start_log_listener():
+    global _log_listener
+    _console = logging.StreamHandler()
+    _console.setFormatter(logging.Formatter(_LOG_FORMAT))
+    _log_listener = QueueListener(_log_queue, _console)
+    _log_listener.start()
+
+
+def _restart_log_listener_in_child():
+    # The inherited queue's lock may be held by the parent's listener thread and its listener thread
+    # does not exist here: give the handlers a new queue and start a listener for it.
+    global _log_queue
+    _log_queue = queue.Queue(-1)
+    for handler in _queue_handlers:
+        handler.queue = _log_queue
+    _start_log_listener()
+
+
+_start_log_listener()
+atexit.register(lambda: _log_listener.stop())
+os.register_at_fork(after_in_child=_restart_log_listener_in_child)
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
     "formatters": {
         # More details for debugging: file, line and function name
-        "verbose": {"format": "[%(asctime)s] %(levelname)s %(name)s %(pathname)s:%(lineno)d %(funcName)s: %(message)s"},
+        "verbose": {"format": _LOG_FORMAT},
         "standard": {"format": "[%(asctime)s] %(levelname)s %(name)s: %(message)s"},
     },
     "handlers": {
-        "console": {"class": "logging.StreamHandler", "formatter": "verbose"},
+        "queue": {"()": _make_queue_handler},
     },
     "loggers": {
         # Django core
-        "django": {"handlers": ["console"], "level": "DEBUG"},
-        "django.request": {"handlers": ["console"], "level": "DEBUG", "propagate": False},
-        "django.server": {"handlers": ["console"], "level": "DEBUG", "propagate": False},
+        "django": {"handlers": ["queue"], "level": _LOG_LEVEL},
+        "django.request": {"handlers": ["queue"], "level": _LOG_LEVEL, "propagate": False},
+        "django.server": {"handlers": ["queue"], "level": _LOG_LEVEL, "propagate": False},
         # ASGI servers / Channels
-        "daphne": {"handlers": ["console"], "level": "DEBUG"},
-        "channels": {"handlers": ["console"], "level": "DEBUG"},
+        "daphne": {"handlers": ["queue"], "level": _LOG_LEVEL},
+        "channels": {"handlers": ["queue"], "level": _LOG_LEVEL},
         # Celery and dependencies
-        "celery": {"handlers": ["console"], "level": "DEBUG", "propagate": True},
-        "celery.app.trace": {"handlers": ["console"], "level": "DEBUG", "propagate": True},
-        "kombu": {"handlers": ["console"], "level": "INFO", "propagate": True},
+        "celery": {"handlers": ["queue"], "level": _LOG_LEVEL, "propagate": True},
+        "celery.app.trace": {"handlers": ["queue"], "level": _LOG_LEVEL, "propagate": True},
+        "kombu": {"handlers": ["queue"], "level": "INFO", "propagate": True},
         # Third-party libs used in video/audio
-        "moviepy": {"handlers": ["console"], "level": "INFO", "propagate": True},
+        "moviepy": {"handlers": ["queue"], "level": "INFO", "propagate": True},
         # Keep asyncio noise moderate
-        "asyncio": {"handlers": ["console"], "level": "WARNING"},
+        "asyncio": {"handlers": ["queue"], "level": "WARNING"},
     }
 }
@@ -1,9 +1,13 @@
-from django.contrib import admin
+from django.conf import settings
 from django.urls import path
 from api.api import api
 
 urlpatterns = [
-    path("admin/", admin.site.urls),
     path("api/", api.urls),
 ]
 
+if settings.ENABLE_ADMIN:
+    from django.contrib import admin
+
+    urlpatterns.insert(0, path("admin/", admin.site.urls))
+